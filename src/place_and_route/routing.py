@@ -9,13 +9,18 @@ __copyright__ = "Copyright (c) 2024 Nikolaos Kostakis"
 __license__ = "MIT License"
 __version__ = "1.0"
 
+import heapq
 import logging
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import numpy as np
 
 import config
 from structures.design_components import Design, IOPort, Component, Net, Pin
 from structures.design_components import NetPoint, NetTreeNode
+from structures.design_components import RoutingWorkspace, CompactNetTree
 from structures.design_components import get_center_coordinates
 
 # Logging
@@ -24,175 +29,2237 @@ routingLogger.setLevel(logging.DEBUG)
 routingLogger.addHandler(config.consoleHandler)
 routingLogger.addHandler(config.logfileHandler)
 
-def maze_routing_net(
-    net:Net, design: Design,
-    startRoutingFromCenter:bool = False,
+# Directions of movement on the bins grid
+NORTH = 0
+EAST = 1
+SOUTH = 2
+WEST = 3
+OPPOSITE_DIRECTION = (SOUTH, WEST, NORTH, EAST)
+"""The direction leading back, indexed by direction"""
+CLOCKWISE_RANKING = (0, 1, 2, 3)
+"""Backtracking preference (lower first) of each direction: NESW"""
+COUNTERCLOCKWISE_RANKING = (0, 3, 2, 1)
+"""Backtracking preference (lower first) of each direction: NWSE"""
+
+# Layers of a layered bins grid, by their preferred direction
+HORIZONTAL_LAYER = 0
+VERTICAL_LAYER = 1
+
+# Routing engines
+LEE_ENGINE = "lee"
+ASTAR_ENGINE = "astar"
+BIDIRECTIONAL_ENGINE = "bidirectional"
+HADLOCK_ENGINE = "hadlock"
+LINE_PROBE_ENGINE = "lineprobe"
+DIJKSTRA_ENGINE = "dijkstra"
+WAVE_ENGINE = "wave"
+PATTERN_ENGINE = "pattern"
+HANAN_ENGINE = "hanan"
+JPS_ENGINE = "jps"
+ALT_ENGINE = "alt"
+BITBOARD_ENGINE = "bitboard"
+BATCH_ENGINE = "batch"
+LAYERED_ENGINE = "layered"
+ROUTING_ENGINES = (
+    LEE_ENGINE, ASTAR_ENGINE, BIDIRECTIONAL_ENGINE, HADLOCK_ENGINE,
+    LINE_PROBE_ENGINE, DIJKSTRA_ENGINE, WAVE_ENGINE, PATTERN_ENGINE,
+    HANAN_ENGINE, JPS_ENGINE, ALT_ENGINE, BITBOARD_ENGINE, BATCH_ENGINE,
+    LAYERED_ENGINE
+)
+"""Search engines available for routing the connections of the nets"""
+
+# Weights of the cost grid used by the Dijkstra engine
+USAGE_COST_WEIGHT = 1.0
+"""Cost added to a bin for every net routed through it"""
+DENSITY_COST_WEIGHT = 0.5
+"""Cost added to a bin for every component or I/O port in it"""
+
+TILE_HALO = 2
+"""Bins around a tile which the nets routed in it may also use"""
+
+CORRIDOR_MARGIN = 1
+"""Coarse bins around the coarse route of a net included in its corridor"""
+
+LANDMARK_COUNT = 4
+"""Landmarks whose distances bound the searches of the ALT engine"""
+
+PRIM_DIJKSTRA_ALPHA = 0.3
+"""Trade-off of the Steiner topology between wirelength (0) and radius (1)"""
+STEINER_BOX_MARGIN = 2
+"""Bins around the segments of the Steiner topology searched first"""
+
+BATCH_SIZE = 32
+"""Nets whose first connections the batch engine searches together"""
+
+VIA_COST = 2
+"""Cost of a via between the layers, in bins of wire, for the layered engine"""
+
+def calculate_routing_costs(
+    design:Design,
+    usageWeight:float = USAGE_COST_WEIGHT,
+    densityWeight:float = DENSITY_COST_WEIGHT
+) -> np.ndarray:
+    """
+    Returns the cost of entering each bin, combining the routing usage of
+    the bins and the density of the components in them on top of the unit
+    cost. Blocked bins cannot be entered and cost infinity.
+    """
+    costs = 1 + usageWeight * design.bins.bins \
+            + densityWeight * design.componentBins.bins
+    costs[design.blockages.bins != 0] = np.inf
+
+    return costs
+# End of function
+
+def calculate_layer_costs(
+    design:Design, usageWeight:float = USAGE_COST_WEIGHT
+) -> np.ndarray:
+    """
+    Returns the cost of entering each bin on the horizontal and on the
+    vertical layer, adding the routing usage of the bins on the layer to
+    the unit cost. Without layers, every bin costs 1 on both.
+    """
+    if design.layerBins is None:
+        return np.ones((2,) + design.bins.size)
+
+    return 1 + usageWeight * design.layerBins.bins
+# End of function
+
+def calculate_free_components(design:Design) -> np.ndarray:
+    """
+    Returns the label of the connected component of the free bins each bin
+    belongs to, -1 for the blocked bins. Two bins can only be connected if
+    they have the same label.
+    """
+    return _free_components(design.blockages.bins == 0)
+# End of function
+
+def _free_components(freeBins:np.ndarray) -> np.ndarray:
+    """
+    Labels the connected components of the free bins.
+
+    The runs of free bins along each row are numbered at once, and the runs
+    touching the runs of the next row are joined with a union-find, whose
+    roots give the label of the bins of every run.
+    """
+    height, width = freeBins.shape
+
+    # The runs of free bins of the rows, numbered in row-major order
+    starts = freeBins.copy()
+    starts[:, 1:] &= ~freeBins[:, :-1]
+    runs = np.cumsum(starts.ravel()).reshape(height, width) - 1
+    runCount = int(np.count_nonzero(starts))
+
+    # The runs above and below each pair of vertically adjacent free bins
+    joined = freeBins[:-1, :] & freeBins[1:, :]
+    pairs = np.unique(
+        np.stack((runs[:-1, :][joined], runs[1:, :][joined]), axis=1), axis=0)
+
+    parent = list(range(runCount))
+
+    def _find(run:int) -> int:
+        """Returns the root of the run, halving the path to it"""
+        while (parent[run] != run):
+            parent[run] = parent[parent[run]]
+            run = parent[run]
+        return run
+    # End of inner function
+
+    for upper, lower in pairs.tolist():
+        upperRoot, lowerRoot = _find(upper), _find(lower)
+        if (upperRoot != lowerRoot):
+            parent[max(upperRoot, lowerRoot)] = min(upperRoot, lowerRoot)
+    # End of for
+
+    roots = np.array([_find(run) for run in range(runCount)], dtype=np.int64)
+    _, labels = np.unique(roots, return_inverse=True)
+
+    components = np.full((height, width), -1, dtype=np.int32)
+    components[freeBins] = labels[runs[freeBins]]
+
+    return components
+# End of function
+
+def calculate_landmark_distances(
+    design:Design, count:int = LANDMARK_COUNT
+) -> np.ndarray:
+    """
+    Returns the distances of the free bins from each of the given number
+    of landmarks, as a (count, height, width) array, with -1 for the bins
+    a landmark cannot reach. They only depend on the blockages, so they
+    hold for all the nets routed while the blockages stay the same.
+    """
+    return _landmark_distances(design.blockages.bins == 0, count)
+# End of function
+
+def _landmark_distances(freeBins:np.ndarray, count:int) -> np.ndarray:
+    """
+    Picks the landmarks among the free bins, the first nearest to the top
+    left corner and each next farthest from those already picked, and
+    floods the free bins from each one.
+    """
+    height, width = freeBins.shape
+    distances = np.full((count, height, width), -1, dtype=np.int32)
+    if not freeBins.any():
+        return distances
+
+    rows, columns = np.indices((height, width))
+    nearest = np.where(freeBins, rows + columns, height + width)
+    landmark = np.unravel_index(np.argmin(nearest), nearest.shape)
+
+    # Distance of each bin from the nearest landmark picked
+    closest = np.full((height, width), height * width, dtype=np.int32)
+    for i in range(count):
+        distances[i] = _flood_distances(freeBins, landmark)
+        reached = (distances[i] >= 0)
+        closest[reached] = np.minimum(closest[reached], distances[i][reached])
+        landmark = np.unravel_index(
+            np.argmax(np.where(freeBins, closest, -1)), closest.shape)
+    # End of for
+
+    return distances
+# End of function
+
+def _flood_distances(
+    freeBins:np.ndarray, source:tuple[int,int]
+) -> np.ndarray:
+    """
+    Returns the distances of the free bins from the source, with -1 for the
+    bins it cannot reach. The flood keeps its front as an array of the
+    flattened bins, so each step costs as much as the front.
+    """
+    height, width = freeBins.shape
+    free = freeBins.ravel()
+    distance = np.full(height * width, -1, dtype=np.int32)
+    column = np.tile(np.arange(width), height)
+
+    front = np.array([source[0] * width + source[1]])
+    distance[front] = 0
+    step = 0
+    while (len(front) != 0):
+        step += 1
+        neighbours = np.concatenate((
+            front[front >= width] - width,
+            front[column[front] != (width - 1)] + 1,
+            front[front < (height - 1) * width] + width,
+            front[column[front] != 0] - 1
+        ))
+        neighbours = neighbours[free[neighbours] & (distance[neighbours] < 0)]
+        front = np.unique(neighbours)
+        distance[front] = step
+    # End of while
+
+    return distance.reshape(height, width)
+# End of function
+
+def _landmark_bounds(
+    landmarks:np.ndarray, drain:tuple[int,int]
+) -> np.ndarray:
+    """
+    Returns, for the flattened bins, the lower bound of their distance from
+    the drain: the largest of their Manhattan distance and the differences
+    of their distances from each landmark and the drain's, which the
+    triangle inequality keeps below the distance
+    """
+    count, height, width = landmarks.shape
+    rows, columns = np.indices((height, width))
+    bounds = np.abs(rows - drain[0]) + np.abs(columns - drain[1])
+
+    for i in range(count):
+        drainDistance = landmarks[i][drain]
+        if (drainDistance < 0):
+            continue
+        known = (landmarks[i] >= 0)
+        bounds[known] = np.maximum(
+            bounds[known], np.abs(landmarks[i][known] - drainDistance))
+    # End of for
+
+    return bounds.ravel()
+# End of function
+
+def _neighbour_bins(
+    index:int, height:int, width:int
+) -> list[tuple[int,int]]:
+    """
+    Returns the (direction, index) pairs of the neighbours of the given bin,
+    on the flattened bins array, in NESW order
+    """
+    row, column = divmod(index, width)
+
+    neighbours:list[tuple[int,int]] = []
+    if (row != 0):
+        neighbours.append((NORTH, index - width))
+    if ((column + 1) != width):
+        neighbours.append((EAST, index + 1))
+    if ((row + 1) != height):
+        neighbours.append((SOUTH, index + width))
+    if (column != 0):
+        neighbours.append((WEST, index - 1))
+
+    return neighbours
+# End of function
+
+def _lee_wave_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    earlyTermination:bool = True, workspace:RoutingWorkspace = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Lee's wave propagation from the bins of the net towards the drain.
+
+    The wave is a FIFO queue over the flattened bins, with the distance from
+    the net and the direction leading back to the net of each labelled bin
+    kept in arrays. Among the neighbours one step closer to the net, the
+    predecessor is the first in the backtracking order (NESW for clockwise,
+    NWSE for counterclockwise routing).
+
+    With early termination, the wave stops once every bin closer to the net
+    than the drain has been expanded, as the predecessors of the drain and
+    of the bins leading to it are then final. Otherwise the whole grid is
+    flooded.
+
+    The arrays of the given routing workspace are used, or of a new one.
+    The free bins are read from their bytes, as the wave visits them one
+    at a time.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = freeBins.astype(bool, copy=False).tobytes()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    offsets = (-width, 1, width, -1)
+
+    if workspace is None:
+        workspace = RoutingWorkspace()
+    generation = workspace.start_search(height * width)
+    labelled = workspace.stamps
+    distance = workspace.values
+    predecessor = workspace.predecessor
+    target = drain[0] * width + drain[1]
+    # Distance of the drain once labelled, longer than any path until then
+    targetDistance = height * width
+
+    explored = 0
+    wave:deque[int] = deque()
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        labelled[index] = generation
+        distance[index] = 0
+        wave.append(index)
+
+    while (len(wave) != 0):
+        activeBin = wave.popleft()
+        activeDistance = distance[activeBin]
+        if (earlyTermination and (activeDistance >= targetDistance)):
+            break
+
+        explored += 1
+        nextDistance = activeDistance + 1
+        row, column = divmod(activeBin, width)
+        inGrid = (
+            row != 0, (column + 1) != width, (row + 1) != height, column != 0)
+        for direction in (NORTH, EAST, SOUTH, WEST):
+            neighbour = activeBin + offsets[direction]
+            if not (inGrid[direction] and free[neighbour]):
+                continue
+
+            backDirection = OPPOSITE_DIRECTION[direction]
+            if (labelled[neighbour] != generation):
+                labelled[neighbour] = generation
+                distance[neighbour] = nextDistance
+                predecessor[neighbour] = backDirection
+                # The wave does not propagate through the drain
+                if (neighbour != target):
+                    wave.append(neighbour)
+                else:
+                    targetDistance = nextDistance
+            elif (
+                (distance[neighbour] == nextDistance)
+                and (ranking[backDirection] < ranking[predecessor[neighbour]])
+            ):
+                predecessor[neighbour] = backDirection
+        # End of for
+    # End of while
+
+    if (labelled[target] != generation):
+        return None, explored
+
+    return _backtrack_predecessors(predecessor, netMask, drain), explored
+# End of function
+
+def _vectorized_wave_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    earlyTermination:bool = True
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Lee's wave propagation with whole-array operations.
+
+    Every step of the wave labels at once the free bins next to the wave
+    front, shifting the front in the four directions. The array operations
+    run in NumPy without holding the GIL, so nets can be routed in parallel
+    threads. The path is backtracked over the distances with
+    _backtrack_distances, which gives the same path as _lee_wave_search.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    distance = np.full(freeBins.shape, -1, dtype=np.int32)
+    distance[netMask] = 0
+    labelled = netMask.copy()
+    front = netMask.copy()
+    grown = np.empty_like(front)
+
+    step = 0
+    while front.any():
+        step += 1
+        grown[:] = False
+        grown[1:, :] |= front[:-1, :]
+        grown[:-1, :] |= front[1:, :]
+        grown[:, 1:] |= front[:, :-1]
+        grown[:, :-1] |= front[:, 1:]
+        grown &= freeBins
+        grown &= ~labelled
+
+        labelled |= grown
+        distance[grown] = step
+        if grown[drain]:
+            if earlyTermination:
+                break
+            # The wave does not propagate through the drain
+            grown[drain] = False
+
+        front, grown = grown, front
+    # End of while
+
+    if (distance[drain] == -1):
+        # Every labelled bin was expanded
+        return None, int(np.count_nonzero(labelled))
+
+    if earlyTermination:
+        # The bins closer to the net than the drain were expanded
+        explored = int(np.count_nonzero((distance >= 0) & (distance < step)))
+    else:
+        explored = int(np.count_nonzero(labelled)) - 1
+
+    return _backtrack_distances(
+        distance, netMask, drain, clockwiseRouting), explored
+# End of function
+
+def _bitboard_wave_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    earlyTermination:bool = True
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Lee's wave propagation on packed bitboards.
+
+    The free bins and the wave front are packed 64 bins to a word along the
+    rows, so every step of the wave labels the whole front with a few word
+    operations per 64 bins: shifting the words between rows for north and
+    south, and the bits, carried over to the next word, for east and west.
+    The step each bin is reached at is recorded only from the non-empty
+    words of the front, and the path is backtracked over these distances
+    as in _vectorized_wave_search, giving the same path as Lee's wave.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = _pack_bitboard(freeBins)
+    labelled = _pack_bitboard(netMask)
+    front = labelled.copy()
+    one, last = np.uint64(1), np.uint64(63)
+    drainWord, drainBit = drain[1] >> 6, np.uint64(1 << (drain[1] & 63))
+
+    distance = np.full((height, width), -1, dtype=np.int32)
+    distance[netMask] = 0
+    explored = int(np.count_nonzero(netMask))
+
+    step = 0
+    reached = False
+    while front.any():
+        step += 1
+        grown = front << one
+        grown[:, 1:] |= front[:, :-1] >> last
+        west = front >> one
+        west[:, :-1] |= front[:, 1:] << last
+        grown |= west
+        grown[1:, :] |= front[:-1, :]
+        grown[:-1, :] |= front[1:, :]
+        grown &= free
+        grown &= ~labelled
+        labelled |= grown
+
+        rows, words = np.nonzero(grown)
+        bits = np.unpackbits(
+            grown[rows, words].view(np.uint8).reshape(-1, 8),
+            axis=1, bitorder="little"
+        )
+        wordIndices, bitIndices = np.nonzero(bits)
+        distance[rows[wordIndices], words[wordIndices] * 64 + bitIndices] = step
+
+        if (grown[drain[0], drainWord] & drainBit):
+            reached = True
+            if earlyTermination:
+                break
+            # The wave does not propagate through the drain
+            grown[drain[0], drainWord] &= ~drainBit
+        explored += len(wordIndices)
+
+        front = grown
+    # End of while
+
+    if not reached:
+        return None, explored
+
+    if not earlyTermination:
+        # The drain was counted with the bins expanded
+        explored -= 1
+
+    return _backtrack_distances(
+        distance, netMask, drain, clockwiseRouting), explored
+# End of function
+
+def _pack_bitboard(bins:np.ndarray) -> np.ndarray:
+    """
+    Packs the rows of a boolean array into words of 64 bins, the bin of
+    the lowest column in the lowest bit
+    """
+    height, width = bins.shape
+    words = -(-width // 64)
+    padded = np.zeros((height, words * 64), dtype=bool)
+    padded[:, :width] = bins
+
+    return np.packbits(padded, axis=1, bitorder="little").view("<u8") \
+             .astype(np.uint64)
+# End of function
+
+def _backtrack_distances(
+    distance:np.ndarray, netMask:np.ndarray, drain:tuple[int,int],
     clockwiseRouting:bool = True
-) -> None:
+) -> list[tuple[int,int]]:
     """
-    Routing algorithm based on Lee's Maze Routing for a single net
+    Follows the distances from the net from the drain back to the net,
+    taking among the neighbours one step closer to the net the first in the
+    backtracking order (NESW for clockwise, NWSE for counterclockwise
+    routing), as the predecessors of Lee's wave.
+
+    Returns the path of bins, starting with the drain and ending with the bin
+    of the net that was reached.
     """
+    height, width = distance.shape
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    steps = ((-1, 0), (0, 1), (1, 0), (0, -1))
+    directions = sorted(range(4), key=lambda direction: ranking[direction])
+
+    activeBin = drain
+    path = [drain]
+    while not netMask[activeBin]:
+        previousDistance = distance[activeBin] - 1
+        for direction in directions:
+            y = activeBin[0] + steps[direction][0]
+            x = activeBin[1] + steps[direction][1]
+            if (
+                (0 <= y < height) and (0 <= x < width)
+                and (distance[y, x] == previousDistance)
+            ):
+                activeBin = (y, x)
+                break
+        # End of for
+        path.append(activeBin)
+    # End of while
 
-    def _propagate_wave_phase() -> None:
-        """
-        First phase of the maze routing algorithm.
+    return path
+# End of function
+
+def _batched_wave_search(
+    freeBins:np.ndarray, netMasks:np.ndarray, drains:list[tuple[int,int]],
+    clockwiseRouting:bool = True, earlyTermination:bool = True
+) -> list[tuple[(list[tuple[int,int]] | None), int]]:
+    """
+    Lee's wave propagation for a batch of connections at once.
+
+    The bins of the net of each connection are a layer of the stacked net
+    masks, and every step of the waves labels the bins next to the wave
+    fronts of all the layers with the same whole-array operations, as in
+    _vectorized_wave_search. The wave of a layer stops once its drain is
+    reached, if the search terminates early, and the path of each layer is
+    backtracked with _backtrack_distances, giving the same paths as Lee's
+    wave.
+
+    Returns for each connection the path from the drain to the first bin of
+    the net reached, or None if the drain cannot be reached, and the number
+    of bins explored.
+    """
+    layers = np.arange(len(drains))
+    drainY = np.array([drain[0] for drain in drains], dtype=np.intp)
+    drainX = np.array([drain[1] for drain in drains], dtype=np.intp)
+
+    distance = np.full(netMasks.shape, -1, dtype=np.int32)
+    distance[netMasks] = 0
+    labelled = netMasks.copy()
+    front = netMasks.copy()
+    grown = np.empty_like(front)
+
+    # The step each drain was reached at, 0 for the drains on their net
+    reachedStep = np.where(netMasks[layers, drainY, drainX], 0, -1)
+    front[reachedStep == 0] = False
+
+    step = 0
+    while front.any():
+        step += 1
+        grown[:] = False
+        grown[:, 1:, :] |= front[:, :-1, :]
+        grown[:, :-1, :] |= front[:, 1:, :]
+        grown[:, :, 1:] |= front[:, :, :-1]
+        grown[:, :, :-1] |= front[:, :, 1:]
+        grown &= freeBins
+        grown &= ~labelled
+
+        labelled |= grown
+        distance[grown] = step
+        reached = grown[layers, drainY, drainX]
+        if reached.any():
+            reachedStep[reached] = step
+            if earlyTermination:
+                grown[reached] = False
+            else:
+                # The waves do not propagate through the drains
+                grown[layers[reached], drainY[reached], drainX[reached]] = False
+
+        front, grown = grown, front
+    # End of while
+
+    connections = []
+    for layer, drain in enumerate(drains):
+        if (reachedStep[layer] == 0):
+            connections.append(([drain], 0))
+        elif (reachedStep[layer] == -1):
+            # Every labelled bin was expanded
+            connections.append(
+                (None, int(np.count_nonzero(labelled[layer]))))
+        else:
+            if earlyTermination:
+                # The bins closer to the net than the drain were expanded
+                explored = int(np.count_nonzero(
+                    (distance[layer] >= 0)
+                    & (distance[layer] < reachedStep[layer])
+                ))
+            else:
+                explored = int(np.count_nonzero(labelled[layer])) - 1
+            connections.append((
+                _backtrack_distances(
+                    distance[layer], netMasks[layer], drain, clockwiseRouting),
+                explored
+            ))
+    # End of for
+
+    return connections
+# End of function
+
+def _layered_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    layerCosts:np.ndarray = None, viaCost:float = VIA_COST
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Dijkstra's search from the bins of the net towards the drain on a
+    horizontal and a vertical layer of the bins grid.
+
+    On the horizontal layer the search only moves east and west, and on
+    the vertical layer north and south. Changing layer in a bin is a via,
+    costing viaCost on top of entering the bin on the other layer. Entering
+    a bin costs its given cost on the layer, 1 if none are given. The bins
+    of the net are on both layers, so the path turns only at vias.
+
+    Predecessors follow the same backtracking order as Lee's wave among
+    bins of equal cost, vias coming last.
+
+    Returns the path from the drain to the first bin of the net reached,
+    projected on the grid, or None if the drain cannot be reached, and the
+    number of bins explored on the layers.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    size = height * width
+    free = freeBins.ravel().tolist()
+    onNet = netMask.ravel().tolist()
+    if layerCosts is None:
+        costs = [1] * (2 * size)
+    else:
+        costs = layerCosts.ravel().tolist()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    # The direction of a via, ranked after the four directions
+    via = 4
+    directionRanking = ranking + (via,)
+    offsets = (-width, 1, width, -1)
+
+    # The layers of a bin follow each other: state = layer * size + index
+    cost = [np.inf] * (2 * size)
+    closed = bytearray(2 * size)
+    predecessor = bytearray(2 * size)
+    drainIndex = drain[0] * width + drain[1]
+
+    explored = 0
+    target = None
+    openList:list[tuple[float,int]] = []
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        for layer in (HORIZONTAL_LAYER, VERTICAL_LAYER):
+            cost[layer * size + index] = 0
+            heapq.heappush(openList, (0, layer * size + index))
+
+    while (len(openList) != 0):
+        activeCost, activeState = heapq.heappop(openList)
+        if (closed[activeState] | (activeCost > cost[activeState])):
+            continue
+        closed[activeState] = True
+
+        layer, index = divmod(activeState, size)
+        if (index == drainIndex):
+            target = activeState
+            break
+
+        explored += 1
+        y, x = divmod(index, width)
+        if (layer == HORIZONTAL_LAYER):
+            moves = ((EAST, x + 1 < width), (WEST, x > 0))
+        else:
+            moves = ((NORTH, y > 0), (SOUTH, y + 1 < height))
+        neighbours = [
+            (direction, activeState + offsets[direction])
+            for direction, inGrid in moves
+            if (inGrid and free[index + offsets[direction]])
+        ]
+        otherState = (1 - layer) * size + index
+        neighbours.append((via, otherState))
+
+        for direction, neighbour in neighbours:
+            if closed[neighbour]:
+                continue
+
+            backDirection = via if (direction == via) \
+                            else OPPOSITE_DIRECTION[direction]
+            nextCost = activeCost + costs[neighbour]
+            if (direction == via):
+                nextCost += viaCost
+            if (nextCost < cost[neighbour]):
+                cost[neighbour] = nextCost
+                predecessor[neighbour] = backDirection
+                heapq.heappush(openList, (nextCost, neighbour))
+            elif (
+                (nextCost == cost[neighbour])
+                & (
+                    directionRanking[backDirection]
+                    < directionRanking[predecessor[neighbour]]
+                )
+            ):
+                predecessor[neighbour] = backDirection
+        # End of for
+    # End of while
+
+    if target is None:
+        return None, explored
+
+    path = [drain]
+    state = target
+    while True:
+        layer, index = divmod(state, size)
+        if (predecessor[state] == via):
+            state = (1 - layer) * size + index
+            continue
+        index += offsets[predecessor[state]]
+        state = layer * size + index
+        path.append(divmod(index, width))
+        if onNet[index]:
+            break
+    # End of while
+
+    return path, explored
+# End of function
+
+def _path_layer_bins(
+    path:list[tuple[int,int]]
+) -> list[tuple[int,int,int]]:
+    """
+    Returns the bins of the layers (layer,y,x) the path uses, leaving out
+    its last bin, on the net: the horizontal layer along its horizontal
+    segments, the vertical along its vertical ones and both at its turns.
+    """
+    layerBins = []
+    for i, bin in enumerate(path[:-1]):
+        neighbours = [path[i + 1]] if (i == 0) else [path[i - 1], path[i + 1]]
+        layers = {
+            HORIZONTAL_LAYER if (neighbour[0] == bin[0]) else VERTICAL_LAYER
+            for neighbour in neighbours
+        }
+        for layer in sorted(layers):
+            layerBins.append((layer, bin[0], bin[1]))
+    # End of for
+
+    return layerBins
+# End of function
+
+def _pattern_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Pattern routing of the drain to the nearest bin of the net.
+
+    The L-shaped routes, with one corner, are tried first and then the
+    Z-shaped ones, with two corners, checking the bins of each against the
+    free bins at once. The route is cut at the first bin of the net it
+    reaches. For clockwise routing the L going vertically first is tried
+    first, otherwise the one going horizontally first. All the patterns are
+    shortest paths, as they never turn back.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if every pattern is blocked, and the number of bins checked.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    netArray = np.array(netBins)
+    distances = np.abs(netArray[:, 0] - drain[0]) \
+                + np.abs(netArray[:, 1] - drain[1])
+    y0, x0 = drain
+    y1, x1 = (int(coordinate) for coordinate in netArray[np.argmin(distances)])
+
+    # The corners of each pattern, from the drain towards the net
+    if ((y0 == y1) | (x0 == x1)):
+        patterns = [[]]
+    else:
+        patterns = [[(y1, x0)], [(y0, x1)]]
+        if not clockwiseRouting:
+            patterns.reverse()
+        xStep = 1 if (x1 > x0) else -1
+        yStep = 1 if (y1 > y0) else -1
+        patterns += [
+            [(y0, x), (y1, x)] for x in range(x0 + xStep, x1, xStep)]
+        patterns += [
+            [(y, x0), (y, x1)] for y in range(y0 + yStep, y1, yStep)]
+    # End of if
+
+    explored = 0
+    for corners in patterns:
+        ys, xs = _pattern_bins([drain] + corners + [(y1, x1)])
+        # The first bin of the net on the pattern, the last one at the latest
+        reached = int(np.argmax(netMask[ys, xs]))
+        explored += reached + 1
+        if freeBins[ys[:reached], xs[:reached]].all():
+            return [
+                (int(ys[i]), int(xs[i])) for i in range(reached + 1)
+            ], explored
+    # End of for
+
+    return None, explored
+# End of function
+
+def _pattern_bins(
+    points:list[tuple[int,int]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns the rows and the columns of the bins of the straight segments
+    joining the given points in order
+    """
+    ys = [np.array([points[0][0]])]
+    xs = [np.array([points[0][1]])]
+    for (ya, xa), (yb, xb) in zip(points[:-1], points[1:]):
+        if (ya != yb):
+            step = 1 if (yb > ya) else -1
+            ys.append(np.arange(ya + step, yb + step, step))
+            xs.append(np.full(abs(yb - ya), xa))
+        elif (xa != xb):
+            step = 1 if (xb > xa) else -1
+            xs.append(np.arange(xa + step, xb + step, step))
+            ys.append(np.full(abs(xb - xa), ya))
+    # End of for
+
+    return np.concatenate(ys), np.concatenate(xs)
+# End of function
+
+def _astar_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    bounds:np.ndarray = None, workspace:RoutingWorkspace = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    A* search from the bins of the net towards the drain.
+
+    The bins are expanded in order of their distance from the net plus the
+    Manhattan distance to the drain, which never overestimates, so the path
+    found is a shortest one. Other lower bounds of the distance of the
+    flattened bins from the drain, as from _landmark_bounds, may be given
+    instead. Ties are broken in favour of the bins closer to the drain.
+    Predecessors follow the same backtracking order as Lee's wave. The
+    arrays of the given routing workspace are used, or of a new one.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = freeBins.astype(bool, copy=False).tobytes()
+    if bounds is not None:
+        bounds = bounds.tolist()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    offsets = (-width, 1, width, -1)
+
+    if workspace is None:
+        workspace = RoutingWorkspace()
+    generation = workspace.start_search(height * width)
+    labelled = workspace.stamps
+    closed = workspace.closedStamps
+    cost = workspace.values
+    predecessor = workspace.predecessor
+    target = drain[0] * width + drain[1]
+
+    def _heuristic(index:int) -> int:
+        """Lower bound of the distance of the bin from the drain"""
+        if bounds is not None:
+            return int(bounds[index])
+        row, column = divmod(index, width)
+        return abs(drain[0] - row) + abs(drain[1] - column)
+    # End of inner function
+
+    explored = 0
+    openList:list[tuple[int,int,int]] = []
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        labelled[index] = generation
+        cost[index] = 0
+        heuristic = _heuristic(index)
+        heapq.heappush(openList, (heuristic, heuristic, index))
+
+    while (len(openList) != 0):
+        _, _, activeBin = heapq.heappop(openList)
+        if (closed[activeBin] == generation):
+            continue
+        closed[activeBin] = generation
+
+        if (activeBin == target):
+            break
+
+        explored += 1
+        nextCost = cost[activeBin] + 1
+        row, column = divmod(activeBin, width)
+        inGrid = (
+            row != 0, (column + 1) != width, (row + 1) != height, column != 0)
+        for direction in (NORTH, EAST, SOUTH, WEST):
+            neighbour = activeBin + offsets[direction]
+            if not (inGrid[direction] and free[neighbour]):
+                continue
+
+            backDirection = OPPOSITE_DIRECTION[direction]
+            if (
+                (labelled[neighbour] != generation)
+                or (nextCost < cost[neighbour])
+            ):
+                labelled[neighbour] = generation
+                cost[neighbour] = nextCost
+                predecessor[neighbour] = backDirection
+                heuristic = _heuristic(neighbour)
+                heapq.heappush(
+                    openList, (nextCost + heuristic, heuristic, neighbour))
+            elif (
+                (cost[neighbour] == nextCost)
+                and (ranking[backDirection] < ranking[predecessor[neighbour]])
+            ):
+                predecessor[neighbour] = backDirection
+        # End of for
+    # End of while
+
+    if (closed[target] != generation):
+        return None, explored
+
+    return _backtrack_predecessors(predecessor, netMask, drain), explored
+# End of function
+
+def _bidirectional_lee_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Bidirectional Lee's wave between the bins of the net and the drain.
+
+    One wave grows from the net and one from the drain, a whole level at a
+    time, expanding each time the one with the smaller front. The search ends
+    with the level in which the waves meet, keeping the shortest of the
+    meetings found in it. The path is stitched from the predecessors of the
+    drain's wave up to the meeting and of the net's wave from it onwards.
 
-        Propagates wave from the source (existing net)
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = freeBins.ravel()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    steps = (-width, 1, width, -1)
+
+    # Index 0 for the wave of the net, 1 for the wave of the drain
+    distance = (
+        np.full(height * width, -1, dtype=np.int32),
+        np.full(height * width, -1, dtype=np.int32)
+    )
+    predecessor = (
+        np.zeros(height * width, dtype=np.int8),
+        np.zeros(height * width, dtype=np.int8)
+    )
+    target = drain[0] * width + drain[1]
+
+    fronts:list[list[int]] = [[], [target]]
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        distance[0][index] = 0
+        fronts[0].append(index)
+    distance[1][target] = 0
+
+    meeting:tuple[int,int] = None
+    """Bins (net's wave, drain's wave) of the shortest meeting"""
+    meetingLength = 0
+    explored = 0
+
+    while ((len(fronts[0]) != 0) & (len(fronts[1]) != 0) & (meeting is None)):
+        side = 0 if (len(fronts[0]) <= len(fronts[1])) else 1
+        other = 1 - side
+
+        newFront:list[int] = []
+        explored += len(fronts[side])
+        for activeBin in fronts[side]:
+            nextDistance = distance[side][activeBin] + 1
+            for direction, neighbour in _neighbour_bins(
+                activeBin, height, width
+            ):
+                if not free[neighbour]:
+                    continue
+
+                if (distance[other][neighbour] != -1):
+                    # The waves meet
+                    length = nextDistance + distance[other][neighbour]
+                    if ((meeting is None) or (length < meetingLength)):
+                        meetingLength = length
+                        if (side == 0):
+                            meeting = (activeBin, neighbour)
+                        else:
+                            meeting = (neighbour, activeBin)
+                    continue
+
+                backDirection = OPPOSITE_DIRECTION[direction]
+                if (distance[side][neighbour] == -1):
+                    distance[side][neighbour] = nextDistance
+                    predecessor[side][neighbour] = backDirection
+                    newFront.append(neighbour)
+                elif (
+                    (distance[side][neighbour] == nextDistance)
+                    & (ranking[backDirection]
+                        < ranking[predecessor[side][neighbour]])
+                ):
+                    predecessor[side][neighbour] = backDirection
+            # End of for
+        # End of for
+        fronts[side] = newFront
+    # End of while
+
+    if meeting is None:
+        return None, explored
+
+    netSideBin, drainSideBin = meeting
+
+    # From the drain to the meeting
+    drainChain:list[int] = []
+    activeBin = drainSideBin
+    while (activeBin != target):
+        drainChain.append(activeBin)
+        activeBin += steps[predecessor[1][activeBin]]
+    drainChain.append(target)
+    drainChain.reverse()
+
+    path = [divmod(index, width) for index in drainChain]
+    # From the meeting to the net
+    path.extend(_backtrack_predecessors(
+        predecessor[0], netMask, divmod(netSideBin, width)))
+
+    return path, explored
+# End of function
+
+def _hadlock_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    workspace:RoutingWorkspace = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Hadlock's minimum detour search from the bins of the net to the drain.
+
+    Bins are labelled with their detour number, the number of steps taken
+    away from the drain. Steps towards the drain keep the label and are
+    expanded first, at the front of a 0-1 BFS queue, so the search heads
+    straight for the drain until it meets a blockage. As the bins of the net
+    are at different distances from the drain, each label is kept as the
+    length of the path it bounds, the Manhattan distance of its start plus
+    twice its detours, in a bucket queue. The arrays of the given routing
+    workspace are used, or of a new one.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = freeBins.astype(bool, copy=False).tobytes()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    offsets = (-width, 1, width, -1)
+
+    if workspace is None:
+        workspace = RoutingWorkspace()
+    generation = workspace.start_search(height * width)
+    labelled = workspace.stamps
+    closed = workspace.closedStamps
+    label = workspace.values
+    predecessor = workspace.predecessor
+    target = drain[0] * width + drain[1]
+
+    def _manhattan_distance(index:int) -> int:
+        """Manhattan distance of the bin from the drain"""
+        row, column = divmod(index, width)
+        return abs(drain[0] - row) + abs(drain[1] - column)
+    # End of inner function
+
+    buckets:dict[int, deque[int]] = {}
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        labelled[index] = generation
+        label[index] = _manhattan_distance(index)
+        buckets.setdefault(label[index], deque()).append(index)
+
+    explored = 0
+    while (len(buckets) != 0):
+        activeLabel = min(buckets)
+        bucket = buckets[activeLabel]
+        activeBin = bucket.popleft()
+        if (len(bucket) == 0):
+            del buckets[activeLabel]
+
+        if (
+            (closed[activeBin] == generation)
+            or (label[activeBin] != activeLabel)
+        ):
+            continue
+        closed[activeBin] = generation
+
+        if (activeBin == target):
+            break
+
+        explored += 1
+        distance = _manhattan_distance(activeBin)
+        row, column = divmod(activeBin, width)
+        inGrid = (
+            row != 0, (column + 1) != width, (row + 1) != height, column != 0)
+        for direction in (NORTH, EAST, SOUTH, WEST):
+            neighbour = activeBin + offsets[direction]
+            if (
+                (not (inGrid[direction] and free[neighbour]))
+                or (closed[neighbour] == generation)
+            ):
+                continue
+
+            backDirection = OPPOSITE_DIRECTION[direction]
+            if (_manhattan_distance(neighbour) < distance):
+                # Towards the drain, no detour
+                newLabel = activeLabel
+            else:
+                newLabel = activeLabel + 2
+
+            if (
+                (labelled[neighbour] != generation)
+                or (newLabel < label[neighbour])
+            ):
+                labelled[neighbour] = generation
+                label[neighbour] = newLabel
+                predecessor[neighbour] = backDirection
+                if (newLabel == activeLabel):
+                    buckets.setdefault(newLabel, deque()).appendleft(neighbour)
+                else:
+                    buckets.setdefault(newLabel, deque()).append(neighbour)
+            elif (
+                (label[neighbour] == newLabel)
+                and (ranking[backDirection] < ranking[predecessor[neighbour]])
+            ):
+                predecessor[neighbour] = backDirection
+        # End of for
+    # End of while
+
+    if (closed[target] != generation):
+        return None, explored
+
+    return _backtrack_predecessors(predecessor, netMask, drain), explored
+# End of function
+
+def _weighted_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], costs:np.ndarray, clockwiseRouting:bool = True,
+    workspace:RoutingWorkspace = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Dijkstra's search from the bins of the net towards the drain, where
+    entering each bin has the given cost instead of a unit one.
+
+    Predecessors follow the same backtracking order as Lee's wave among
+    bins of equal cost. The arrays of the given routing workspace are used,
+    or of a new one.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    free = freeBins.astype(bool, copy=False).tobytes()
+    binCosts = costs.ravel().tolist()
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    offsets = (-width, 1, width, -1)
+
+    if workspace is None:
+        workspace = RoutingWorkspace()
+    generation = workspace.start_search(height * width)
+    labelled = workspace.stamps
+    closed = workspace.closedStamps
+    cost = workspace.values
+    predecessor = workspace.predecessor
+    target = drain[0] * width + drain[1]
+
+    explored = 0
+    openList:list[tuple[float,int]] = []
+    for bin in netBins:
+        index = bin[0] * width + bin[1]
+        labelled[index] = generation
+        cost[index] = 0
+        heapq.heappush(openList, (0, index))
+
+    while (len(openList) != 0):
+        activeCost, activeBin = heapq.heappop(openList)
+        if (
+            (closed[activeBin] == generation)
+            or (activeCost > cost[activeBin])
+        ):
+            continue
+        closed[activeBin] = generation
+
+        if (activeBin == target):
+            break
+
+        explored += 1
+        row, column = divmod(activeBin, width)
+        inGrid = (
+            row != 0, (column + 1) != width, (row + 1) != height, column != 0)
+        for direction in (NORTH, EAST, SOUTH, WEST):
+            neighbour = activeBin + offsets[direction]
+            if (
+                (not (inGrid[direction] and free[neighbour]))
+                or (closed[neighbour] == generation)
+            ):
+                continue
+
+            backDirection = OPPOSITE_DIRECTION[direction]
+            nextCost = activeCost + binCosts[neighbour]
+            if (
+                (labelled[neighbour] != generation)
+                or (nextCost < cost[neighbour])
+            ):
+                labelled[neighbour] = generation
+                cost[neighbour] = nextCost
+                predecessor[neighbour] = backDirection
+                heapq.heappush(openList, (nextCost, neighbour))
+            elif (
+                (nextCost == cost[neighbour])
+                and (ranking[backDirection] < ranking[predecessor[neighbour]])
+            ):
+                predecessor[neighbour] = backDirection
+        # End of for
+    # End of while
+
+    if (closed[target] != generation):
+        return None, explored
+
+    return _backtrack_predecessors(predecessor, netMask, drain), explored
+# End of function
+
+def _line_probe_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Mikami-Tabuchi line-probe search between the bins of the net and the
+    drain.
+
+    Instead of labelling bins, horizontal and vertical lines are grown from
+    the drain and from the bins of the net, extending until a blockage or
+    the edge of the grid. On each level, perpendicular lines are grown from
+    every bin of the previous level's lines, until a line of the drain
+    crosses a line of the net. Only the lines are stored, so memory scales
+    with the lines grown and not with the grid. The path found has few
+    corners but is not necessarily a shortest one; among the crossings of a
+    level, the one giving the shortest path is kept.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+
+    # Lines as (horizontal, fixed coordinate, first, last, base bin, parent)
+    lines:list[tuple[bool, int, int, int, tuple[int,int], int]] = []
+    # Lines of each side (0 for the net, 1 for the drain) per row/column
+    rowLines:tuple[dict, dict] = ({}, {})
+    columnLines:tuple[dict, dict] = ({}, {})
+    explored = 0
+
+    def _is_covered(side:int, bin:tuple[int,int], horizontal:bool) -> bool:
+        """Checks if the bin is already on a line of the side"""
+        if horizontal:
+            lineIds = rowLines[side].get(bin[0], [])
+            position = bin[1]
+        else:
+            lineIds = columnLines[side].get(bin[1], [])
+            position = bin[0]
+
+        for lineId in lineIds:
+            if (lines[lineId][2] <= position <= lines[lineId][3]):
+                return True
+        return False
+    # End of inner function
+
+    def _grow_line(
+        side:int, bin:tuple[int,int], horizontal:bool, parent:int
+    ) -> int:
+        """Grows a line through the bin and returns its index"""
+        nonlocal explored
+
+        if horizontal:
+            fixed, position, freeLine = bin[0], bin[1], freeBins[bin[0], :]
+        else:
+            fixed, position, freeLine = bin[1], bin[0], freeBins[:, bin[1]]
+
+        # Extend on both sides up to the first blocked bin
+        blocked = np.flatnonzero(~freeLine[:position])
+        first = (blocked[-1] + 1) if (len(blocked) != 0) else 0
+        blocked = np.flatnonzero(~freeLine[position:])
+        last = (position + blocked[0] - 1) if (len(blocked) != 0) \
+            else (len(freeLine) - 1)
+
+        lines.append((horizontal, fixed, int(first), int(last), bin, parent))
+        lineId = len(lines) - 1
+        if horizontal:
+            rowLines[side].setdefault(fixed, []).append(lineId)
+        else:
+            columnLines[side].setdefault(fixed, []).append(lineId)
+
+        explored += last - first + 1
+        return lineId
+    # End of inner function
+
+    def _find_crossings(
+        side:int, lineId:int
+    ) -> list[tuple[tuple[int,int], int]]:
+        """
+        Returns the bins where the line meets lines of the other side,
+        along with the line met
         """
+        horizontal, fixed, first, last, _, _ = lines[lineId]
+        other = 1 - side
+        if horizontal:
+            parallelLines, crossingLines = rowLines[other], columnLines[other]
+        else:
+            parallelLines, crossingLines = columnLines[other], rowLines[other]
+
+        crossings = []
+        for otherId in parallelLines.get(fixed, []):
+            otherFirst, otherLast = lines[otherId][2], lines[otherId][3]
+            if ((otherFirst <= last) & (first <= otherLast)):
+                position = max(first, otherFirst)
+                bin = (fixed, position) if horizontal else (position, fixed)
+                crossings.append((bin, otherId))
+
+        for position, otherIds in crossingLines.items():
+            if not (first <= position <= last):
+                continue
+            for otherId in otherIds:
+                if (lines[otherId][2] <= fixed <= lines[otherId][3]):
+                    bin = (fixed, position) if horizontal else (position, fixed)
+                    crossings.append((bin, otherId))
+
+        return crossings
+    # End of inner function
+
+    def _trace_back(bin:tuple[int,int], lineId:int) -> list[tuple[int,int]]:
+        """Returns the corners from the bin back to the start of its lines"""
+        corners = [bin]
+        while (lineId != -1):
+            base = lines[lineId][4]
+            if (base != corners[-1]):
+                corners.append(base)
+            lineId = lines[lineId][5]
+        return corners
+    # End of inner function
+
+    # Level 0: lines through the bins of the net and the drain
+    fronts:list[list[int]] = [[], []]
+    for bin in netBins:
+        for horizontal in (True, False):
+            if not _is_covered(0, bin, horizontal):
+                fronts[0].append(_grow_line(0, bin, horizontal, -1))
+    for horizontal in (True, False):
+        fronts[1].append(_grow_line(1, drain, horizontal, -1))
+
+    crossings:list[tuple[tuple[int,int], int, int]] = []
+    """Crossings as (bin, line of the net, line of the drain)"""
+    for lineId in fronts[1]:
+        for bin, otherId in _find_crossings(1, lineId):
+            crossings.append((bin, otherId, lineId))
+
+    while (
+        (len(crossings) == 0)
+        & ((len(fronts[0]) != 0) | (len(fronts[1]) != 0))
+    ):
+        for side in (1, 0):
+            newFront:list[int] = []
+            for lineId in fronts[side]:
+                horizontal, fixed, first, last, _, _ = lines[lineId]
+                for position in range(first, last + 1):
+                    bin = (fixed, position) if horizontal else (position, fixed)
+                    if _is_covered(side, bin, not horizontal):
+                        continue
+
+                    newId = _grow_line(side, bin, not horizontal, lineId)
+                    newFront.append(newId)
+                    for crossingBin, otherId in _find_crossings(side, newId):
+                        if (side == 0):
+                            crossings.append((crossingBin, newId, otherId))
+                        else:
+                            crossings.append((crossingBin, otherId, newId))
+                # End of for
+            # End of for
+            fronts[side] = newFront
+        # End of for
+    # End of while
+
+    if (len(crossings) == 0):
+        return None, explored
+
+    bestPath:list[tuple[int,int]] = None
+    for bin, netLineId, drainLineId in crossings:
+        corners = _trace_back(bin, drainLineId)
+        corners.reverse()
+        corners.extend(_trace_back(bin, netLineId)[1:])
+
+        path = _simplify_path(_expand_corners(corners), netMask)
+        if ((bestPath is None) or (len(path) < len(bestPath))):
+            bestPath = path
+
+    return bestPath, explored
+# End of function
+
+def calculate_hanan_blockages(
+    design:Design
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the blockage lines of the design for the Hanan grid, as given
+    by _hanan_blockages. They only depend on the blockages, so they hold for
+    all the nets routed on the whole grid while the blockages stay the same.
+    """
+    return _hanan_blockages(design.blockages.bins == 0)
+# End of function
+
+def _hanan_blockages(
+    freeBins:np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the rows and the columns after which the free bins change, and
+    the blocked bins before each bin of its row and of its column
+    """
+    blocked = ~freeBins
+    rowBlocked = np.zeros((blocked.shape[0], blocked.shape[1] + 1), np.int32)
+    np.cumsum(blocked, axis=1, out=rowBlocked[:, 1:])
+    columnBlocked = np.zeros(
+        (blocked.shape[0] + 1, blocked.shape[1]), np.int32)
+    np.cumsum(blocked, axis=0, out=columnBlocked[1:, :])
+
+    return (
+        np.flatnonzero(np.diff(freeBins, axis=0).any(axis=1)),
+        np.flatnonzero(np.diff(freeBins, axis=1).any(axis=0)),
+        rowBlocked,
+        columnBlocked
+    )
+# End of function
+
+def _hanan_lines(
+    freeChanges:np.ndarray, netBins:set[tuple[int,int]], size:int,
+    line:int, axis:int
+) -> np.ndarray:
+    """
+    Returns the lines of the Hanan grid along the given axis (0 for rows,
+    1 for columns) of the given size: the first and the last line, the
+    line of the drain and the lines on both sides of every change of the
+    free bins or the net. The changes of the net are found from its bins,
+    where the next or the previous bin along the axis is not on the net.
+    """
+    step = (1, 0) if (axis == 0) else (0, 1)
+    netChanges = []
+    for bin in netBins:
+        position = bin[axis]
+        if (
+            (position + 1 < size)
+            and ((bin[0] + step[0], bin[1] + step[1]) not in netBins)
+        ):
+            netChanges.append(position)
+        if (
+            (position > 0)
+            and ((bin[0] - step[0], bin[1] - step[1]) not in netBins)
+        ):
+            netChanges.append(position - 1)
+    # End of for
+
+    changes = np.concatenate(
+        (freeChanges, np.array(netChanges, dtype=freeChanges.dtype)))
+
+    return np.unique(np.concatenate((
+        [0, size - 1, line], changes, changes + 1
+    )))
+# End of function
+
+def _hanan_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    hananBlockages:tuple = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    A* search on the Hanan grid compressing the bins grid.
+
+    The Hanan grid keeps only the rows and columns of the drain and those
+    bounding the blockages and the bins of the net, on which a shortest
+    rectilinear path always exists. Its nodes are their crossings, joined
+    along the lines when every bin between them is free,
+    with the number of bins as the length. The search runs from the nodes
+    of the net towards the drain, guided by the Manhattan distance to it,
+    so it depends on the number of pins and obstacles rather than on the
+    area of the grid. The neighbours are expanded in the backtracking order
+    (NESW for clockwise, NWSE for counterclockwise routing). The blockage
+    lines of the free bins, as from _hanan_blockages, are made if not given.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of nodes
+    explored.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    if hananBlockages is None:
+        hananBlockages = _hanan_blockages(freeBins)
+    rowChanges, columnChanges, rowBlocked, columnBlocked = hananBlockages
+    height, width = freeBins.shape
+    netSet = set(netBins)
+    rows = _hanan_lines(rowChanges, netSet, height, drain[0], 0)
+    columns = _hanan_lines(columnChanges, netSet, width, drain[1], 1)
+
+    # The lines between neighbouring nodes are free if no bin is blocked
+    # on them, counted with the blocked bins before each bin of its line
+    horizontalFree = (
+        rowBlocked[np.ix_(rows, columns[1:] + 1)]
+        == rowBlocked[np.ix_(rows, columns[:-1])]
+    ).tolist()
+    verticalFree = (
+        columnBlocked[np.ix_(rows[1:] + 1, columns)]
+        == columnBlocked[np.ix_(rows[:-1], columns)]
+    ).tolist()
+
+    rowList = rows.tolist()
+    columnList = columns.tolist()
+    nodeRows, nodeColumns = len(rowList), len(columnList)
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    directions = sorted(range(4), key=lambda direction: ranking[direction])
+
+    def _heuristic(node:tuple[int,int]) -> int:
+        return abs(rowList[node[0]] - drain[0]) \
+               + abs(columnList[node[1]] - drain[1])
+    # End of inner function
+
+    target = (rowList.index(drain[0]), columnList.index(drain[1]))
+    distance:dict[tuple[int,int], int] = {}
+    previous:dict[tuple[int,int], tuple[int,int]] = {}
+    heap = []
+    pushed = 0
+    for node in zip(*np.nonzero(netMask[np.ix_(rows, columns)])):
+        node = (int(node[0]), int(node[1]))
+        distance[node] = 0
+        previous[node] = None
+        heap.append((_heuristic(node), pushed, node))
+        pushed += 1
+    heapq.heapify(heap)
+
+    explored = 0
+    settled = set()
+    while (len(heap) != 0):
+        _, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        explored += 1
+        if (node == target):
+            break
+
+        i, j = node
+        nodeDistance = distance[node]
+        for direction in directions:
+            if (direction == NORTH):
+                if ((i == 0) or not verticalFree[i - 1][j]):
+                    continue
+                neighbour = (i - 1, j)
+                length = rowList[i] - rowList[i - 1]
+            elif (direction == EAST):
+                if ((j + 1 == nodeColumns) or not horizontalFree[i][j]):
+                    continue
+                neighbour = (i, j + 1)
+                length = columnList[j + 1] - columnList[j]
+            elif (direction == SOUTH):
+                if ((i + 1 == nodeRows) or not verticalFree[i][j]):
+                    continue
+                neighbour = (i + 1, j)
+                length = rowList[i + 1] - rowList[i]
+            else:
+                if ((j == 0) or not horizontalFree[i][j - 1]):
+                    continue
+                neighbour = (i, j - 1)
+                length = columnList[j] - columnList[j - 1]
+
+            newDistance = nodeDistance + length
+            if (newDistance < distance.get(neighbour, newDistance + 1)):
+                distance[neighbour] = newDistance
+                previous[neighbour] = node
+                heapq.heappush(heap, (
+                    newDistance + _heuristic(neighbour), pushed, neighbour))
+                pushed += 1
+        # End of for
+    # End of while
+
+    if target not in settled:
+        return None, explored
+
+    corners = []
+    node = target
+    while node is not None:
+        corners.append((rowList[node[0]], columnList[node[1]]))
+        node = previous[node]
+
+    return _simplify_path(_expand_corners(corners), netMask), explored
+# End of function
+
+def calculate_jump_tables(
+    design:Design
+) -> tuple[list[list[bool]], list[list[int]], list[list[int]]]:
+    """
+    Returns the jump tables of the free bins of the design for Jump Point
+    Search, as given by _jump_tables. They only depend on the blockages, so
+    they hold for all the nets routed on the whole grid while the blockages
+    stay the same.
+    """
+    return _jump_tables(design.blockages.bins == 0)
+# End of function
+
+def _jump_tables(
+    freeBins:np.ndarray
+) -> tuple[list[list[bool]], list[list[int]], list[list[int]]]:
+    """
+    Returns the free bins and, for every bin, the column of the first stop
+    of a horizontal jump starting on it, going east and going west: a
+    blocked bin, the edge of the grid (width or -1), or a bin with a forced
+    neighbour, whose north or south neighbour is free while the one of the
+    previous bin is not.
+    """
+    height, width = freeBins.shape
+    padded = np.pad(freeBins, 1, constant_values=False)
+    north, south = padded[:-2, 1:-1], padded[2:, 1:-1]
+    northBehindEast, southBehindEast = padded[:-2, :-2], padded[2:, :-2]
+    northBehindWest, southBehindWest = padded[:-2, 2:], padded[2:, 2:]
+
+    stopsEast = ~freeBins | (north & ~northBehindEast) \
+                | (south & ~southBehindEast)
+    stopsWest = ~freeBins | (north & ~northBehindWest) \
+                | (south & ~southBehindWest)
+
+    columns = np.arange(width)
+    eastStops = np.where(stopsEast, columns, width)
+    eastStops = np.minimum.accumulate(eastStops[:, ::-1], axis=1)[:, ::-1]
+    westStops = np.where(stopsWest, columns, -1)
+    westStops = np.maximum.accumulate(westStops, axis=1)
+
+    return freeBins.tolist(), eastStops.tolist(), westStops.tolist()
+# End of function
+
+def _jump_point_search(
+    freeBins:np.ndarray, netBins:list[tuple[int,int]], netMask:np.ndarray,
+    drain:tuple[int,int], clockwiseRouting:bool = True,
+    jumpTables:tuple = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Jump Point Search for the 4-connected bins grid.
+
+    A* from the bins of the net towards the drain, guided by the Manhattan
+    distance to it, that only stops on jump points instead of every bin.
+    Horizontal jumps run straight on, turning north or south only at forced
+    neighbours, found in the jump tables of the free bins. Vertical jumps
+    carry on straight, probing horizontal jumps on both sides at every bin,
+    and stop where one of them finds a jump point. The jump points of the
+    path are the corners expanded to bins. The directions are tried in the
+    backtracking order (NESW for clockwise, NWSE for counterclockwise
+    routing). The jump tables of the free bins are made if not given.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins jumped
+    over.
+    """
+    if netMask[drain]:
+        return [drain], 0
+
+    height, width = freeBins.shape
+    if jumpTables is None:
+        jumpTables = _jump_tables(freeBins)
+    free, eastStops, westStops = jumpTables
+    drainY, drainX = drain
+    ranking = CLOCKWISE_RANKING if clockwiseRouting else COUNTERCLOCKWISE_RANKING
+    directions = sorted(range(4), key=lambda direction: ranking[direction])
+    steps = ((-1, 0), (0, 1), (1, 0), (0, -1))
+    explored = 0
+
+    def _jump_horizontal(y:int, x:int, dx:int) -> (tuple[int,int] | None):
+        """Returns the next jump point east (dx 1) or west (dx -1)"""
+        nonlocal explored
+        if ((x + dx < 0) or (x + dx >= width)):
+            return None
+
+        stop = eastStops[y][x + dx] if (dx == 1) else westStops[y][x + dx]
+        if ((y == drainY) and (0 < (drainX - x) * dx <= (stop - x) * dx)):
+            explored += (drainX - x) * dx
+            return drain
+
+        explored += abs(stop - x)
+        if ((stop < 0) or (stop >= width) or not free[y][stop]):
+            return None
+        return (y, stop)
+    # End of inner function
+
+    def _jump_vertical(y:int, x:int, dy:int) -> (tuple[int,int] | None):
+        """Returns the next jump point north (dy -1) or south (dy 1)"""
+        nonlocal explored
+        while True:
+            y += dy
+            if ((y < 0) or (y >= height) or not free[y][x]):
+                return None
+            explored += 1
+            if ((y, x) == drain):
+                return drain
+
+            for dx in (-1, 1):
+                if ((0 <= x + dx < width) and free[y][x + dx]
+                        and not free[y - dy][x + dx]):
+                    return (y, x)
+            if (
+                (_jump_horizontal(y, x, 1) is not None)
+                or (_jump_horizontal(y, x, -1) is not None)
+            ):
+                return (y, x)
+        # End of while
+    # End of inner function
+
+    def _heuristic(bin:tuple[int,int]) -> int:
+        return abs(bin[0] - drainY) + abs(bin[1] - drainX)
+    # End of inner function
+
+    distance:dict[tuple[int,int], int] = {}
+    previous:dict[tuple[int,int], tuple[int,int]] = {}
+    heap = []
+    for pushed, bin in enumerate(netBins):
+        distance[bin] = 0
+        previous[bin] = None
+        heap.append((_heuristic(bin), pushed, bin))
+    heapq.heapify(heap)
+    pushed = len(heap)
+
+    settled = set()
+    while (len(heap) != 0):
+        _, _, node = heapq.heappop(heap)
+        if node in settled:
+            continue
+        settled.add(node)
+        if (node == drain):
+            break
+
+        y, x = node
+        parent = previous[node]
+        if parent is None:
+            nodeDirections = directions
+        elif (parent[0] == y):
+            # Horizontal: straight on, or turning to forced neighbours
+            dx = 1 if (x > parent[1]) else -1
+            nodeDirections = [
+                direction for direction in directions
+                if (steps[direction] == (0, dx)) or (
+                    (steps[direction][0] != 0)
+                    and (0 <= y + steps[direction][0] < height)
+                    and free[y + steps[direction][0]][x]
+                    and not (
+                        (0 <= x - dx < width)
+                        and free[y + steps[direction][0]][x - dx]
+                    )
+                )
+            ]
+        else:
+            # Vertical: straight on or sideways, never back
+            dy = 1 if (y > parent[0]) else -1
+            nodeDirections = [
+                direction for direction in directions
+                if (steps[direction] != (-dy, 0))
+            ]
+        # End of if
+
+        for direction in nodeDirections:
+            dy, dx = steps[direction]
+            if (dy == 0):
+                jumpPoint = _jump_horizontal(y, x, dx)
+            else:
+                jumpPoint = _jump_vertical(y, x, dy)
+            if jumpPoint is None:
+                continue
+
+            newDistance = distance[node] \
+                          + abs(jumpPoint[0] - y) + abs(jumpPoint[1] - x)
+            if (newDistance < distance.get(jumpPoint, newDistance + 1)):
+                distance[jumpPoint] = newDistance
+                previous[jumpPoint] = node
+                heapq.heappush(heap, (
+                    newDistance + _heuristic(jumpPoint), pushed, jumpPoint))
+                pushed += 1
+        # End of for
+    # End of while
+
+    if drain not in settled:
+        return None, explored
+
+    corners = []
+    node = drain
+    while node is not None:
+        corners.append(node)
+        node = previous[node]
+
+    return _simplify_path(_expand_corners(corners), netMask), explored
+# End of function
+
+def _search_connection(
+    engine:str, freeBins:np.ndarray, netBins:list[tuple[int,int]],
+    netMask:np.ndarray, drain:tuple[int,int], costs:np.ndarray = None,
+    clockwiseRouting:bool = True, earlyTermination:bool = True,
+    landmarks:np.ndarray = None, layerCosts:np.ndarray = None,
+    workspace:RoutingWorkspace = None, jumpTables:tuple = None,
+    hananBlockages:tuple = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Searches the connection of the drain to the net with the given engine,
+    or with Dijkstra's search if costs of entering each bin are given. The
+    ALT engine uses the given distances from landmarks, or picks its own,
+    the layered engine the given costs of the bins on each layer, Jump
+    Point Search the given jump tables of the free bins, and the Hanan
+    engine the given blockage lines, or they make their own.
+    Alone, a connection of the batch engine is searched by the wave engine.
+    The searches over queues of bins use the given routing workspace.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached, and the number of bins explored.
+    """
+    explored = 0
+    if ((engine == PATTERN_ENGINE) & (costs is None)):
+        # The maze search is only needed if every pattern is blocked
+        path, explored = _pattern_search(
+            freeBins, netBins, netMask, drain, clockwiseRouting)
+        if path is not None:
+            return path, explored
+
+    if costs is not None:
+        path, searched = _weighted_search(
+            freeBins, netBins, netMask, drain, costs, clockwiseRouting,
+            workspace
+        )
+    else:
+        match engine:
+            case "astar":
+                path, searched = _astar_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    workspace=workspace
+                )
+            case "bidirectional":
+                path, searched = _bidirectional_lee_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting)
+            case "hadlock":
+                path, searched = _hadlock_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    workspace
+                )
+            case "lineprobe":
+                path, searched = _line_probe_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting)
+            case "wave" | "batch":
+                path, searched = _vectorized_wave_search(
+                    freeBins, netBins, netMask, drain,
+                    clockwiseRouting, earlyTermination
+                )
+            case "bitboard":
+                path, searched = _bitboard_wave_search(
+                    freeBins, netBins, netMask, drain,
+                    clockwiseRouting, earlyTermination
+                )
+            case "hanan":
+                path, searched = _hanan_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    hananBlockages
+                )
+            case "jps":
+                path, searched = _jump_point_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    jumpTables
+                )
+            case "layered":
+                path, searched = _layered_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    layerCosts
+                )
+            case "alt":
+                if landmarks is None:
+                    landmarks = _landmark_distances(freeBins, LANDMARK_COUNT)
+                path, searched = _astar_search(
+                    freeBins, netBins, netMask, drain, clockwiseRouting,
+                    _landmark_bounds(landmarks, drain), workspace
+                )
+            case _:
+                path, searched = _lee_wave_search(
+                    freeBins, netBins, netMask, drain,
+                    clockwiseRouting, earlyTermination, workspace
+                )
+        # End of match engine
+    # End of if costs
+
+    return path, explored + searched
+# End of function
+
+def _search_connection_in_box(
+    engine:str, freeBins:np.ndarray, netBins:list[tuple[int,int]],
+    netMask:np.ndarray, drain:tuple[int,int], costs:np.ndarray,
+    clockwiseRouting:bool, earlyTermination:bool,
+    box:tuple[int,int,int,int], landmarks:np.ndarray = None,
+    layerCosts:np.ndarray = None, workspace:RoutingWorkspace = None
+) -> tuple[(list[tuple[int,int]] | None), int]:
+    """
+    Searches the connection of the drain to the bins of the net in the box
+    (yMin, yMax, xMin, xMax), clipped to the grid, with _search_connection.
+
+    Returns the path from the drain to the first bin of the net reached,
+    or None if the drain cannot be reached in the box, and the number of
+    bins explored.
+    """
+    height, width = freeBins.shape
+    yMin, yMax = max(box[0], 0), min(box[1], height - 1)
+    xMin, xMax = max(box[2], 0), min(box[3], width - 1)
+
+    boxBins = [
+        (y - yMin, x - xMin) for (y, x) in netBins
+        if ((yMin <= y <= yMax) and (xMin <= x <= xMax))
+    ]
+    if (len(boxBins) == 0):
+        return None, 0
+
+    path, explored = _search_connection(
+        engine,
+        freeBins[yMin:yMax + 1, xMin:xMax + 1],
+        boxBins,
+        netMask[yMin:yMax + 1, xMin:xMax + 1],
+        (drain[0] - yMin, drain[1] - xMin),
+        None if costs is None else costs[yMin:yMax + 1, xMin:xMax + 1],
+        clockwiseRouting,
+        earlyTermination,
+        None if landmarks is None \
+            else landmarks[:, yMin:yMax + 1, xMin:xMax + 1],
+        None if layerCosts is None \
+            else layerCosts[:, yMin:yMax + 1, xMin:xMax + 1],
+        workspace
+    )
+    if path is None:
+        return None, explored
+
+    return [(y + yMin, x + xMin) for (y, x) in path], explored
+# End of function
+
+def _steiner_topology(
+    rootBin:tuple[int,int], endpoints:list, alpha:float = PRIM_DIJKSTRA_ALPHA,
+    margin:int = STEINER_BOX_MARGIN
+) -> tuple[list, dict[str, tuple[int,int,int,int]]]:
+    """
+    Plans the topology of a net with the Prim-Dijkstra trade-off.
+
+    Starting from the root, the endpoint joined next is the one with the
+    lowest Manhattan distance to a pin of the tree plus alpha times the
+    path length from the root to that pin. An alpha of 0 gives Prim's
+    minimum spanning tree and an alpha of 1 the shortest path tree.
+
+    Returns the endpoints in the order they join the tree and the box
+    (yMin, yMax, xMin, xMax) of each one's segment, around the endpoint and
+    the pin it joins with a margin of bins, by endpoint name.
+    """
+    treeBins = [rootBin]
+    pathLengths = [0]
+    # Lowest cost and the tree pin giving it of each endpoint left
+    costs = [
+        abs(rootBin[0] - endpoint.bin[0]) + abs(rootBin[1] - endpoint.bin[1])
+        for endpoint in endpoints
+    ]
+    parents = [0] * len(endpoints)
+    joined = [False] * len(endpoints)
+
+    order = []
+    boxes:dict[str, tuple[int,int,int,int]] = {}
+    for _ in range(len(endpoints)):
+        nextIndex = min(
+            (i for i in range(len(endpoints)) if not joined[i]),
+            key=lambda i: costs[i]
+        )
+        joined[nextIndex] = True
+        endpoint = endpoints[nextIndex]
+        parentBin = treeBins[parents[nextIndex]]
+        y, x = endpoint.bin
+
+        order.append(endpoint)
+        boxes[endpoint.name] = (
+            min(y, parentBin[0]) - margin, max(y, parentBin[0]) + margin,
+            min(x, parentBin[1]) - margin, max(x, parentBin[1]) + margin
+        )
+
+        pathLength = pathLengths[parents[nextIndex]] \
+                     + abs(y - parentBin[0]) + abs(x - parentBin[1])
+        treeBins.append((y, x))
+        pathLengths.append(pathLength)
+        for i, other in enumerate(endpoints):
+            if joined[i]:
+                continue
+            cost = alpha * pathLength \
+                   + abs(y - other.bin[0]) + abs(x - other.bin[1])
+            if (cost < costs[i]):
+                costs[i] = cost
+                parents[i] = len(treeBins) - 1
+        # End of for
+    # End of for
+
+    return order, boxes
+# End of function
+
+def _expand_corners(corners:list[tuple[int,int]]) -> list[tuple[int,int]]:
+    """
+    Expands a list of corners, each on the same row or column as the
+    previous one, to the path of bins connecting them
+    """
+    path = [corners[0]]
+    for corner in corners[1:]:
+        activeBin = path[-1]
+        stepY = (corner[0] > activeBin[0]) - (corner[0] < activeBin[0])
+        stepX = (corner[1] > activeBin[1]) - (corner[1] < activeBin[1])
+        while (activeBin != corner):
+            activeBin = (activeBin[0] + stepY, activeBin[1] + stepX)
+            path.append(activeBin)
+
+    return path
+# End of function
+
+def _simplify_path(
+    path:list[tuple[int,int]], netMask:np.ndarray
+) -> list[tuple[int,int]]:
+    """
+    Removes the loops of a path and ends it on its first bin on the net
+    """
+    simplePath:list[tuple[int,int]] = []
+    positions:dict[tuple[int,int], int] = {}
+    for bin in path:
+        if bin in positions:
+            # Loop back to an earlier bin of the path
+            for removedBin in simplePath[positions[bin] + 1:]:
+                del positions[removedBin]
+            del simplePath[positions[bin] + 1:]
+        else:
+            positions[bin] = len(simplePath)
+            simplePath.append(bin)
+
+        if netMask[bin]:
+            break
+
+    return simplePath
+# End of function
+
+def _backtrack_predecessors(
+    predecessor:np.ndarray, netMask:np.ndarray, drain:tuple[int,int]
+) -> list[tuple[int,int]]:
+    """
+    Follows the predecessor directions from the drain back to the net.
+
+    Returns the path of bins, starting with the drain and ending with the bin
+    of the net that was reached.
+    """
+    width = netMask.shape[1]
+    steps = (-width, 1, width, -1)
+    isNetBin = netMask.ravel()
+
+    activeBin = drain[0] * width + drain[1]
+    path = [drain]
+    while not isNetBin[activeBin]:
+        activeBin += steps[predecessor[activeBin]]
+        path.append(divmod(activeBin, width))
+
+    return path
+# End of function
+
+def _find_corner_bins(path:list[tuple[int,int]]) -> list[tuple[int,int]]:
+    """
+    Returns the bins of the path where its direction changes, ordered from
+    the net towards the drain
+    """
+    corners:list[tuple[int,int]] = []
+    for i in range(1, len(path) - 1):
+        previousBin, activeBin, nextBin = path[i - 1], path[i], path[i + 1]
+        if (
+            ((activeBin[0] - previousBin[0]) != (nextBin[0] - activeBin[0]))
+            | ((activeBin[1] - previousBin[1]) != (nextBin[1] - activeBin[1]))
+        ):
+            corners.insert(0, activeBin)
+
+    return corners
+# End of function
+
+def _routing_source(
+    net:Net, design:Design, startRoutingFromCenter:bool = False
+) -> tuple[(IOPort|Component|NetPoint), list[(IOPort|Component)]]:
+    """
+    Returns the point the routing of the net starts from, its source or a
+    new point on the center of its bounding box, and the endpoints to
+    connect to it, nearest to its bin first
+    """
 
-        def _propagate_to_direction(direction: tuple[int, int]) -> None:
-            """
-            Propagates (if possible) the wave to the given direction
-            """
-            if (
-                (direction != drain)
-                & (direction not in activeList)
-                & (direction not in visitedList)
-                & (design.blockages[direction] == 0)
-            ):
-                activeList.append(direction)
-                tempBinsArray[direction] = tempBinsArray[activeBin] + 1
-        # End of inner function
-        
-        activeList:list[tuple[int,int]] = []
-        visitedList:list[tuple[int,int]] = []
-
-        activeList.extend(netBins)
-
-        while (len(activeList) != 0):
-            activeBin = activeList.pop(0)
-
-            #NESW movement is chosen
-            # North
-            if (activeBin[0] != 0):
-                north = ((activeBin[0] - 1), activeBin[1])
-                _propagate_to_direction(north)
-            # End if North
-            # East
-            if ((activeBin[1] + 1) != size[1]):
-                east = (activeBin[0], (activeBin[1] + 1))
-                _propagate_to_direction(east)
-            # End if East
-            # South
-            if ((activeBin[0] +1) != size[0]):
-                south = ((activeBin[0] + 1), activeBin[1])
-                _propagate_to_direction(south)
-            # End if South
-            # West
-            if (activeBin[1] != 0):
-                west = (activeBin[0], (activeBin[1] - 1))
-                _propagate_to_direction(west)
-            # End if West
-           
-            visitedList.append(activeBin)
-        # End of while
-    # End of function
+    def _distance_bins(bin):
+        dist = (sourceBin[0] - bin[0])**2 + (sourceBin[1] - bin[1])**2
+        return dist
+    # End of inner function
 
-    def _backtracking_phase():
-        """
-        Second phase of the maze routing algorithm.
+    if startRoutingFromCenter:
+        # For the routing on the center of of the bounding
+        # box the source is a new point created there
 
-        Backtracking from the destination to the source.
-        """
-        def _check_backtrack_to_direction(direction: tuple[int, int]) -> bool:
+        cX,cY = calculate_bb_center(net)
+        cName = f"{net.name}_center"
+        sourcePoint = NetPoint(cName, cX, cY)
+        sourcePoint.bin = design.find_bin((cX, cY))
+        sourceBin = sourcePoint.bin
 
-            return (tempBinsArray[direction] < value) & (direction != drain) \
-                    & (design.blockages[direction] == 0)
-        # End of inner function
+        # The new drain is the net's drain plus the given source
+        netNewDrain = net.drain.copy()
+        netNewDrain.append(net.source)
+        netNewDrain.sort(key=lambda dr: _distance_bins(dr.bin))
+        netDrain = netNewDrain
+    # End of if startRoutingFromCenter
+    else:
+        # For the default routing the source is the one defined
+        sourcePoint = net.source
+        sourceBin = net.source.bin
 
-        backtrackingRoute = []
-        nextBin: tuple[int, int] = None
-        newDirection: str = None
+        net.drain.sort(key=lambda dr: _distance_bins(dr.bin))
+        netDrain = net.drain
+    # End of else routing from source
 
-        activeBin = drain
-        direction = None
-        value = size[0] + size[1]
-        while True:
-            if (activeBin in netBins):
-                break
+    return sourcePoint, netDrain
+# End of function
 
-            if clockwiseRouting:
-                #NESW
-                # North
-                if (activeBin[0] != 0):
-                    north = ((activeBin[0] - 1), activeBin[1])
-                    if _check_backtrack_to_direction(north):
-                        nextBin = north
-                        newDirection = "NORTH"
-                        value = tempBinsArray[north]
-                # End if North
-                # East
-                if ((activeBin[1] + 1) != size[1]):
-                    east = (activeBin[0], (activeBin[1] + 1))
-                    if _check_backtrack_to_direction(east):
-                        nextBin = east
-                        newDirection = "EAST"
-                        value = tempBinsArray[east]
-                # End if East
-                # South
-                if ((activeBin[0] + 1) != size[0]):
-                    south = ((activeBin[0] + 1), activeBin[1])
-                    if _check_backtrack_to_direction(south):
-                        nextBin = south
-                        newDirection = "SOUTH"
-                        value = tempBinsArray[south]
-                # End if South
-                # West
-                if (activeBin[1] != 0):
-                    west = (activeBin[0], (activeBin[1] - 1))
-                    if _check_backtrack_to_direction(west):
-                        nextBin = west
-                        newDirection = "WEST"
-                        value = tempBinsArray[west]
-                # End if West
-            # End if statement for clockwise
-            else:
-                #NWSE
-                # North
-                if (activeBin[0] != 0):
-                    north = ((activeBin[0] - 1), activeBin[1])
-                    if _check_backtrack_to_direction(north):
-                        nextBin = north
-                        newDirection = "NORTH"
-                        value = tempBinsArray[north]
-                # End if North
-                # West
-                if (activeBin[1] != 0):
-                    west = (activeBin[0], (activeBin[1] - 1))
-                    if _check_backtrack_to_direction(west):
-                        nextBin = west
-                        newDirection = "WEST"
-                        value = tempBinsArray[west]
-                # End if West
-                # South
-                if ((activeBin[0] + 1) != size[0]):
-                    south = ((activeBin[0] + 1), activeBin[1])
-                    if _check_backtrack_to_direction(south):
-                        nextBin = south
-                        newDirection = "SOUTH"
-                        value = tempBinsArray[south]
-                # End if South
-                # East
-                if ((activeBin[1] + 1) != size[1]):
-                    east = (activeBin[0], (activeBin[1] + 1))
-                    if _check_backtrack_to_direction(east):
-                        nextBin = east
-                        newDirection = "EAST"
-                        value = tempBinsArray[east]
-                # End if East
-            # End else for counterclockwise
-            if ((direction != None) & (direction != newDirection)):
-                binsQueue.insert(0, activeBin)
-
-            backtrackingRoute.append(activeBin)
-            activeBin = nextBin
-
-            direction = newDirection
-        # End of while
+def maze_routing_net(
+    net:Net, design: Design,
+    startRoutingFromCenter:bool = False,
+    clockwiseRouting:bool = True,
+    earlyTermination:bool = True,
+    engine:str = LEE_ENGINE,
+    costs:np.ndarray = None,
+    window:tuple[int,int,int,int] = None,
+    updateBins:bool = True,
+    corridor:np.ndarray = None,
+    steinerTopology:bool = False,
+    landmarks:np.ndarray = None,
+    firstConnection:tuple = None,
+    components:np.ndarray = None,
+    compactTree:bool = False,
+    jumpTables:tuple = None,
+    hananBlockages:tuple = None
+) -> int:
+    """
+    Routing algorithm based on Lee's Maze Routing for a single net
 
-        netBins.extend(backtrackingRoute)
-        return activeBin
-    # End of function
+    The connections of the endpoints to the net are searched with the given
+    engine: Lee's wave (default), A*, bidirectional Lee's wave, Hadlock's
+    minimum detour search, Mikami-Tabuchi's line-probe search, Dijkstra's
+    search on the routing costs of the bins, as given by
+    calculate_routing_costs, Lee's wave with array operations or on packed
+    bitboards, L- and Z-shaped patterns falling back to Lee's wave when they
+    are blocked, A* on the Hanan grid of the pins and the blockages, Jump
+    Point Search, A* bounded by the distances from landmarks (ALT), as
+    given by calculate_landmark_distances, or Dijkstra's search on a
+    horizontal and a vertical layer joined by vias, as given by
+    calculate_layer_costs. If costs of entering each bin are given,
+    Dijkstra's search on them is used instead.
+
+    If a window of bins (yMin, yMax, xMin, xMax) is given, the searches are
+    confined to it and endpoints which cannot be reached in it are skipped.
+    If a corridor, marking the bins of the grid the searches may use, is
+    given, they are also confined to it.
+    With the Steiner topology, the order the endpoints are connected in is
+    planned by _steiner_topology, and each connection is first searched in
+    the box of its segment.
+    Unless updateBins is set, the usage of the bins of the design is left
+    to the caller, using the routed bins of the net. The layered engine
+    also keeps the usage of the bins of each layer of a layered grid.
+    The first connection may already be searched, as by the batch engine,
+    given as its drain bin, its path, or None, and the bins explored; it
+    is used if the first endpoint connected is on that drain bin.
+    Endpoints outside the connected component of free bins of the source,
+    as given by calculate_free_components, are rejected without a search.
+    The jump tables and the Hanan blockage lines of the whole grid, as
+    given by calculate_jump_tables and calculate_hanan_blockages, are only
+    used without a window or a corridor, otherwise those of the free bins
+    searched are made once for the net.
+    The endpoints not connected are kept in the failed endpoints of the net.
+    With compactTree, the routed tree of the net is stored in arrays, as
+    a CompactNetTree, instead of its nodes.
+
+    Returns the number of bins explored by the searches.
+    """
 
     def _connection_phase() -> None:
         """
@@ -297,6 +2364,7 @@ def maze_routing_net(
                     newPoint= NetPoint(f"{net.name}_{pointNum}", nx, ey)
                 else:
                     newPoint= NetPoint(f"{net.name}_{pointNum}", ex, ny)
+                newPoint.bin = design.find_bin(newPoint.get_coordinates())
                 pointNum += 1
 
                 newNode = NetTreeNode(newPoint.name,newPoint)
@@ -470,6 +2538,7 @@ def maze_routing_net(
                 parent.point.y = ey
             else:
                 parent.point.x = ex
+            parent.point_moved()
             parent.add_child(endNode)
         # End of inner function
 
@@ -494,58 +2563,102 @@ def maze_routing_net(
         # End of match len(binsQueue)
     # End of function
 
-    def _distance_bins(bin):
-        dist = (sourceBin[0] - bin[0])**2 + (sourceBin[1] - bin[1])**2
-        return dist
-    # End of function
-
 
     # Function body
     if (design.isRouted):
         routingLogger.info("Design is already routed!")
-        return
+        return 0
 
-    tempBinsArray = np.zeros(design.bins.size)
-    size = design.bins.size
+    if (engine not in ROUTING_ENGINES):
+        routingLogger.error(f"There is no routing engine {engine}")
+        return 0
 
     pointNum = 1
     routingLogger.debug(f"Net: {net.name}")
 
-    if startRoutingFromCenter:
-        # For the routing on the center of of the bounding
-        # box the source is a new point created there
-
-        cX,cY = calculate_bb_center(net)
-        cName = f"{net.name}_center"
-        sourcePoint = NetPoint(cName, cX, cY)
-        sourcePoint.bin = design.find_bin((cX, cY))
-        sourceBin = sourcePoint.bin
-        connectionsTree = NetTreeNode(sourcePoint.name, sourcePoint)
-
-        # The new drain is the net's drain plus the given source
-        netNewDrain = net.drain.copy()
-        netNewDrain.append(net.source)
-        netNewDrain.sort(key=lambda dr: _distance_bins(dr.bin))
-        netDrain = netNewDrain
-    # End of if startRoutingFromCenter
-    else:
-        # For the default routing the source is the one defined
-        sourceBin = net.source.bin
-        connectionsTree = NetTreeNode(net.source.name, net.source)
-        
-        net.drain.sort(key=lambda dr: _distance_bins(dr.bin))
-        netDrain = net.drain
-    # End of else routing from source
+    sourcePoint, netDrain = _routing_source(
+        net, design, startRoutingFromCenter)
+    sourceBin = sourcePoint.bin
+    connectionsTree = NetTreeNode(sourcePoint.name, sourcePoint)
+    # The points of the tree are searched by the bins they are in
+    connectionsTree.index_tree(design.binSize)
+    net.failedEndpoints = [
+        endpoint.name for endpoint in netDrain if (endpoint != net.source)]
 
     if (design.blockages[sourceBin] != 0):
         routingLogger.warning(
             f"Net {net.name} cannot be router due to source being into blockage"
         )
-        return
+        return 0
+
+
+    if ((costs is None) & (engine == DIJKSTRA_ENGINE)):
+        costs = calculate_routing_costs(design)
+    if ((landmarks is None) & (engine == ALT_ENGINE)):
+        landmarks = calculate_landmark_distances(design)
+    layerCosts = None
+    if (engine == LAYERED_ENGINE):
+        layerCosts = calculate_layer_costs(design)
+    if components is None:
+        components = calculate_free_components(design)
+    # The scratch arrays of the searches, reused from net to net
+    workspace = design.routing_workspace()
+
+    # The searches run on the bins of the window, whose first bin is at the
+    # offset, keeping the bins they explore in its slice of the grid
+    if window is None:
+        yOffset, xOffset = 0, 0
+        freeBins = (design.blockages.bins == 0)
+    else:
+        yMin, yMax, xMin, xMax = window
+        yOffset, xOffset = yMin, xMin
+        freeBins = (design.blockages.bins[yMin:yMax + 1, xMin:xMax + 1] == 0)
+        if costs is not None:
+            costs = costs[yMin:yMax + 1, xMin:xMax + 1]
+        if landmarks is not None:
+            landmarks = landmarks[:, yMin:yMax + 1, xMin:xMax + 1]
+        if layerCosts is not None:
+            layerCosts = layerCosts[:, yMin:yMax + 1, xMin:xMax + 1]
+    windowHeight, windowWidth = freeBins.shape
+    if corridor is not None:
+        freeBins &= corridor[
+            yOffset:yOffset + windowHeight, xOffset:xOffset + windowWidth]
+    netMask = np.zeros(freeBins.shape, dtype=bool)
+    if (engine == JPS_ENGINE) and (
+        (jumpTables is None) | (window is not None) | (corridor is not None)
+    ):
+        jumpTables = _jump_tables(freeBins)
+    if (engine == HANAN_ENGINE) and (
+        (hananBlockages is None) | (window is not None) | (corridor is not None)
+    ):
+        hananBlockages = _hanan_blockages(freeBins)
 
-    
     netBins = [sourceBin]
+    searchBin = (sourceBin[0] - yOffset, sourceBin[1] - xOffset)
+    if (
+        (searchBin[0] < 0) | (searchBin[0] >= windowHeight) |
+        (searchBin[1] < 0) | (searchBin[1] >= windowWidth)
+    ):
+        routingLogger.warning(
+            f"Net {net.name} cannot be routed due to source being out of "
+            "the routing window"
+        )
+        return 0
+    # The bins of the net in the coordinates of the window
+    searchBins = netBins if window is None else [searchBin]
+    netMask[searchBin] = True
+
+    boxes = None
+    if steinerTopology:
+        netDrain, boxes = _steiner_topology(
+            sourceBin,
+            [endpoint for endpoint in netDrain if (endpoint != net.source)]
+        )
 
+    # The bins of the layers used, on a layered grid
+    netLayerBins = []
+    failedEndpoints = []
+    explored = 0
     for endpoint in netDrain:
         if (endpoint == net.source):
             continue
@@ -556,44 +2669,920 @@ def maze_routing_net(
             routingLogger.warning(
                 f"In net {net.name}: Endpoint {endpoint.name} is into blockage"
             )
+            failedEndpoints.append(endpoint.name)
             continue
 
-        binsQueue: list[tuple[int,int]] = []
-        _propagate_wave_phase()
-        activeBin = _backtracking_phase()
+        if (components[drain] != components[sourceBin]):
+            routingLogger.warning(
+                f"In net {net.name}: Endpoint {endpoint.name} is walled off "
+                "by blockages"
+            )
+            failedEndpoints.append(endpoint.name)
+            continue
 
-        _connection_phase()
+        if window is not None:
+            drain = (drain[0] - yOffset, drain[1] - xOffset)
+            if (
+                (drain[0] < 0) | (drain[0] >= windowHeight) |
+                (drain[1] < 0) | (drain[1] >= windowWidth)
+            ):
+                routingLogger.debug(
+                    f"In net {net.name}: Endpoint {endpoint.name} is out of "
+                    "the routing window"
+                )
+                failedEndpoints.append(endpoint.name)
+                continue
+
+        if ((firstConnection is not None) and (firstConnection[0] == drain)):
+            # The connection was searched beforehand
+            _, path, searched = firstConnection
+            explored += searched
+        else:
+            path = None
+            if boxes is not None:
+                # The connection is first searched in the box of its segment
+                path, searched = _search_connection_in_box(
+                    engine, freeBins, searchBins, netMask, drain, costs,
+                    clockwiseRouting, earlyTermination, (
+                        boxes[endpoint.name][0] - yOffset,
+                        boxes[endpoint.name][1] - yOffset,
+                        boxes[endpoint.name][2] - xOffset,
+                        boxes[endpoint.name][3] - xOffset
+                    ),
+                    landmarks, layerCosts, workspace
+                )
+                explored += searched
+
+            if path is None:
+                path, searched = _search_connection(
+                    engine, freeBins, searchBins, netMask, drain, costs,
+                    clockwiseRouting, earlyTermination, landmarks, layerCosts,
+                    workspace, jumpTables, hananBlockages
+                )
+                explored += searched
+        # End of if firstConnection
+        firstConnection = None
+
+        if path is None:
+            if window is None:
+                routingLogger.warning(
+                    f"In net {net.name}: Endpoint {endpoint.name} is unreachable"
+                )
+            else:
+                routingLogger.debug(
+                    f"In net {net.name}: Endpoint {endpoint.name} is "
+                    "unreachable in the routing window"
+                )
+            failedEndpoints.append(endpoint.name)
+            continue
+
+        for bin in path[:-1]:
+            netMask[bin] = True
+        if window is not None:
+            searchBins.extend(path[:-1])
+            path = [(y + yOffset, x + xOffset) for (y, x) in path]
 
-        tempBinsArray.fill(0)
+        # The path ends on the bin of the net that was reached
+        activeBin = path[-1]
+        binsQueue = _find_corner_bins(path)
+        netBins.extend(path[:-1])
+        if (engine == LAYERED_ENGINE) & (design.layerBins is not None):
+            netLayerBins.extend(_path_layer_bins(path))
+
+        _connection_phase()
     # End of for loop
 
-    for change in netBins:
-        design.bins[change] += 1
+    if updateBins:
+        for change in netBins:
+            design.bins[change] += 1
+        for change in netLayerBins:
+            design.layerBins[change] += 1
+    net.routedBins = netBins
+    net.routedLayerBins = netLayerBins
+    net.failedEndpoints = failedEndpoints
     
-    routingLogger.debug(f"Routing net {net.name} completed")
+    routingLogger.debug(
+        f"Routing net {net.name} completed, {explored} bins explored")
+    connectionsTree.drop_index()
     net.connectionsTree = connectionsTree
-    
+    if compactTree:
+        net.compact_tree()
+
+    return explored
 # End of function
 
 def maze_routing(
-    design: Design, startRoutingFromCenter = False, clockwiseRouting = True
+    design: Design, startRoutingFromCenter = False, clockwiseRouting = True,
+    earlyTermination = True, engine = LEE_ENGINE, jobs = 1,
+    tileSize = 0, halo = TILE_HALO, threads = 1, coarseFactor = 0,
+    steinerTopology = False, compactTrees = False
 ) -> None:
     """
     Routing algorithm based on Lee's Maze Routing
+
+    With more than one job, the nets are routed in parallel processes. With
+    a tile size, the nets lying in a tile of the bins grid are routed in it
+    and its halo, before the rest are routed on the whole grid. Otherwise,
+    with more than one thread, the nets are routed in parallel threads,
+    which gain most with the wave engine. With a coarse factor, each net is
+    routed on a grid coarser by it and then inside the corridor of its
+    coarse route. The Steiner topology plans the connections of each net,
+    as in maze_routing_net. Otherwise, the batch engine routes the nets in
+    batches, searching their first connections together. With compactTrees,
+    the routed trees of the nets are stored in arrays, which also shortens
+    their return from the worker processes.
     """
 
     if (design.isRouted):
         routingLogger.info("Design is already routed!")
         return
 
-    for net in design.core.nets:
-        maze_routing_net(net, design, startRoutingFromCenter, clockwiseRouting)
+    if (engine not in ROUTING_ENGINES):
+        routingLogger.error(f"There is no routing engine {engine}")
+        return
+
+    if (
+        ((jobs > 1) | (tileSize > 0) | (threads > 1))
+        & ((engine == DIJKSTRA_ENGINE) | (engine == LAYERED_ENGINE))
+    ):
+        routingLogger.warning(
+            f"The {engine} engine depends on the order the nets are routed, "
+            "nets will be routed serially"
+        )
+        jobs = 1
+        tileSize = 0
+        threads = 1
+
+    # Keyword arguments of maze_routing_net, common to all nets
+    netOptions = {
+        "startRoutingFromCenter": startRoutingFromCenter,
+        "clockwiseRouting": clockwiseRouting,
+        "earlyTermination": earlyTermination,
+        "engine": engine,
+        "steinerTopology": steinerTopology,
+        "compactTree": compactTrees
+    }
+    # The blockages stay the same for the whole run
+    netOptions["components"] = calculate_free_components(design)
+    if (engine == ALT_ENGINE):
+        netOptions["landmarks"] = calculate_landmark_distances(design)
+    elif (engine == JPS_ENGINE):
+        netOptions["jumpTables"] = calculate_jump_tables(design)
+    elif (engine == HANAN_ENGINE):
+        netOptions["hananBlockages"] = calculate_hanan_blockages(design)
+
+    if (tileSize > 0):
+        explored = _tiled_maze_routing(
+            design, jobs, tileSize, halo, netOptions)
+    elif (jobs > 1):
+        explored = _parallel_maze_routing(design, jobs, netOptions)
+    elif (threads > 1):
+        explored = _threaded_maze_routing(design, threads, netOptions)
+    elif (coarseFactor > 1):
+        explored = _hierarchical_maze_routing(
+            design, coarseFactor, netOptions)
+    elif (engine == BATCH_ENGINE):
+        explored = _batched_maze_routing(design, netOptions)
+    else:
+        explored = 0
+        for net in design.core.nets:
+            explored += maze_routing_net(net, design, **netOptions)
 
     design.isRouted = True
-    routingLogger.debug("Routing completed")
+    routingLogger.info(
+        f"Routing completed with the {engine} engine, "
+        f"{explored} bins explored"
+    )
+    _queue_failed_nets(design)
+# End of function
+
+def _queue_failed_nets(design:Design) -> None:
+    """
+    Keeps the nets of the design with endpoints the routing could not
+    connect in its failed nets, reporting them
+    """
+    design.failedNets = [
+        net for net in design.core.nets if net.failedEndpoints]
+    if (len(design.failedNets) == 0):
+        return
+
+    routingLogger.warning(
+        f"{len(design.failedNets)} nets could not be completed")
+    for net in design.failedNets:
+        routingLogger.debug(
+            f"Net {net.name}: endpoints {', '.join(net.failedEndpoints)} "
+            "not connected"
+        )
+# End of function
+
+def retry_failed_nets(design:Design, **netOptions) -> int:
+    """
+    Rips up and routes again the failed nets of the routed design, with the
+    options of maze_routing_net, as after removing blockages that walled
+    off their endpoints. The nets still failing stay in the failed nets.
+
+    Returns the number of nets completed.
+    """
+    if not design.isRouted:
+        routingLogger.info("Design is not routed yet!")
+        return 0
+
+    failedNets = design.failedNets
+    netOptions["components"] = calculate_free_components(design)
+
+    # maze_routing_net only routes nets of a design not routed yet
+    design.isRouted = False
+    try:
+        for net in failedNets:
+            if net.routedBins is not None:
+                for bin in net.routedBins:
+                    design.bins[bin] -= 1
+                for bin in net.routedLayerBins:
+                    design.layerBins[bin] -= 1
+            net.connectionsTree = None
+            net.routedBins = None
+
+            maze_routing_net(net, design, **netOptions)
+        # End of for
+    finally:
+        design.isRouted = True
+
+    _queue_failed_nets(design)
+    completed = len(failedNets) - len(design.failedNets)
+    routingLogger.info(
+        f"{completed} of {len(failedNets)} failed nets were completed")
+
+    return completed
+# End of function
+
+
+def _batched_maze_routing(design:Design, netOptions:dict) -> int:
+    """
+    Routes the nets in batches of BATCH_SIZE. The first connections of the
+    nets of a batch, from the source to the first endpoint, are searched
+    together by _batched_wave_search, sharing every step of the waves, and
+    the nets are then routed in order with them. The connections after the
+    first depend on the routed bins of the net and are searched alone.
+
+    With a Steiner topology, the wave of each net is kept to the box of its
+    first segment, as maze_routing_net searches it first. The connections
+    not found in their box are left to maze_routing_net.
+
+    Returns the number of bins explored.
+    """
+    freeBins = (design.blockages.bins == 0)
+    nets = design.core.nets
+
+    explored = 0
+    for first in range(0, len(nets), BATCH_SIZE):
+        batch = nets[first:first + BATCH_SIZE]
+
+        # The bins of the first connection of each net
+        batchNets, sourceBins, drains, drainBoxes = [], [], [], []
+        for net in batch:
+            sourcePoint, netDrain = _routing_source(
+                net, design, netOptions.get("startRoutingFromCenter", False))
+            if (design.blockages[sourcePoint.bin] != 0):
+                continue
+            netDrain = [
+                endpoint for endpoint in netDrain
+                if (endpoint != net.source)
+            ]
+            boxes = None
+            if netOptions.get("steinerTopology", False):
+                netDrain, boxes = _steiner_topology(sourcePoint.bin, netDrain)
+            for endpoint in netDrain:
+                if (
+                    netOptions["components"][endpoint.bin]
+                    == netOptions["components"][sourcePoint.bin]
+                ):
+                    batchNets.append(net.name)
+                    sourceBins.append(sourcePoint.bin)
+                    drains.append(endpoint.bin)
+                    drainBoxes.append(
+                        None if boxes is None else boxes[endpoint.name])
+                    break
+            # End of for
+        # End of for
+
+        firstConnections = {}
+        if drains:
+            netMasks = np.zeros((len(drains),) + freeBins.shape, dtype=bool)
+            netMasks[
+                np.arange(len(drains)),
+                [sourceBin[0] for sourceBin in sourceBins],
+                [sourceBin[1] for sourceBin in sourceBins]
+            ] = True
+            batchFreeBins = freeBins
+            if netOptions.get("steinerTopology", False):
+                batchFreeBins = np.zeros(netMasks.shape, dtype=bool)
+                for layer, (sourceBin, box) in enumerate(
+                    zip(sourceBins, drainBoxes)
+                ):
+                    yMin, yMax = max(box[0], 0), box[1] + 1
+                    xMin, xMax = max(box[2], 0), box[3] + 1
+                    if (
+                        (yMin <= sourceBin[0] < yMax)
+                        & (xMin <= sourceBin[1] < xMax)
+                    ):
+                        batchFreeBins[layer, yMin:yMax, xMin:xMax] = \
+                            freeBins[yMin:yMax, xMin:xMax]
+                    else:
+                        # Without the source in its box, the connection is
+                        # searched on the whole grid
+                        batchFreeBins[layer] = freeBins
+                        drainBoxes[layer] = None
+                # End of for
+            # End of if steinerTopology
+            connections = _batched_wave_search(
+                batchFreeBins, netMasks, drains,
+                netOptions.get("clockwiseRouting", True),
+                netOptions.get("earlyTermination", True)
+            )
+            for name, drain, box, (path, searched) in zip(
+                batchNets, drains, drainBoxes, connections
+            ):
+                if ((path is None) and (box is not None)):
+                    # Searched again, in the box then on the whole grid
+                    continue
+                firstConnections[name] = (drain, path, searched)
+        # End of if drains
+
+        for net in batch:
+            explored += maze_routing_net(
+                net, design, firstConnection=firstConnections.get(net.name),
+                **netOptions
+            )
+    # End of for
+
+    return explored
+# End of function
+
+
+_workerDesign:Design = None
+"""Routing copy of the design used by a worker process"""
+
+def _initialize_routing_worker(design:Design) -> None:
+    """Initializer of the worker processes for parallel routing"""
+    global _workerDesign
+    _workerDesign = design
+# End of function
+
+def _route_nets_in_worker(
+    nets:list[Net], netOptions:dict, window:tuple[int,int,int,int] = None
+) -> list[
+    tuple[list[str], CompactNetTree, list[tuple[int,int]], int, list[str]]
+]:
+    """
+    Routes the given nets, routing copies of the nets of the design, on the
+    routing copy of the worker process, with the options of
+    maze_routing_net, searching only in the window of bins if one is given.
+    The usage of the bins is left to the merging of the results.
+
+    Returns for each net the order of its drain, its connections tree
+    compacted, which keeps the endpoints by name, the bins it uses, the
+    number of bins explored and its failed endpoints.
+    """
+    results = []
+    for net in nets:
+        explored = maze_routing_net(
+            net, _workerDesign, window=window, updateBins=False,
+            **netOptions
+        )
+        net.compact_tree()
+        results.append((
+            [endpoint.name for endpoint in net.drain],
+            net.compactTree, net.routedBins, explored, net.failedEndpoints
+        ))
+
+    return results
+# End of function
+
+def _group_nets_by_bounding_box(nets:list[Net]) -> list[list[Net]]:
+    """
+    Groups the nets into batches, in which the bounding boxes of the bins of
+    the nets do not overlap.
+
+    The batches colour the nets as an interval graph on the x extents of
+    their bounding boxes: taken by their left edge, each net goes to the
+    first batch whose bounding boxes it does not overlap. A batch only keeps
+    the boxes that reach the left edge of the net, the others cannot overlap
+    the nets still to place.
+    """
+    batches:list[list[Net]] = []
+    batchBoxes:list[list[tuple[int,int,int,int]]] = []
+
+    boundingBoxes = [calculate_net_bins_bb(net) for net in nets]
+    order = sorted(range(len(nets)), key=lambda i: boundingBoxes[i][2])
+    for i in order:
+        net = nets[i]
+        yMin, yMax, xMin, xMax = boundingBoxes[i]
+        for batch, boxes in zip(batches, batchBoxes):
+            boxes[:] = [box for box in boxes if box[3] >= xMin]
+            if not any(
+                (box[0] <= yMax) and (yMin <= box[1]) for box in boxes
+            ):
+                break
+        else:
+            batch = []
+            boxes = []
+            batches.append(batch)
+            batchBoxes.append(boxes)
+
+        batch.append(net)
+        boxes.append((yMin, yMax, xMin, xMax))
+    # End of for
+
+    return batches
+# End of function
+
+def _parallel_maze_routing(
+    design:Design, jobs:int, netOptions:dict
+) -> int:
+    """
+    Routes the nets of the design in a pool of worker processes, with the
+    options of maze_routing_net.
+
+    The nets are grouped into batches with non-overlapping bounding boxes,
+    and the nets of each batch are shared among the workers, which route
+    routing copies of them on a read-only routing copy of the design, with
+    its bins in shared memory. The workers send back only the compact trees
+    and the bins of the nets, which are merged back in the order of the
+    design's nets, giving the same result as routing them serially.
+
+    Returns the number of bins explored.
+    """
+    nets = design.core.nets
+    batches = _group_nets_by_bounding_box(nets)
+    routingLogger.debug(
+        f"Routing {len(nets)} nets in {len(batches)} batches with {jobs} jobs")
+
+    # The workers attach to the bins of the routing copy in shared memory
+    routingDesign = design.routing_copy(shared=True)
+    results:dict[str, tuple] = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_initialize_routing_worker,
+            initargs=(routingDesign,)
+        ) as executor:
+            for batch in batches:
+                chunkSize = -(-len(batch) // jobs)
+                chunks = [
+                    batch[i:i + chunkSize]
+                    for i in range(0, len(batch), chunkSize)
+                ]
+                futures = [
+                    executor.submit(
+                        _route_nets_in_worker,
+                        [net.routing_copy() for net in chunk], netOptions
+                    )
+                    for chunk in chunks
+                ]
+                for chunk, future in zip(chunks, futures):
+                    for net, result in zip(chunk, future.result()):
+                        results[net.name] = result
+            # End of for
+        # End of with
+    finally:
+        routingDesign.detach_bins()
+
+    # Merge in the order of the nets
+    explored = 0
+    for net in nets:
+        explored += _merge_routed_net(
+            design, net, results[net.name],
+            netOptions.get("compactTree", False)
+        )
+
+    return explored
+# End of function
+
+def _threaded_maze_routing(
+    design:Design, threads:int, netOptions:dict
+) -> int:
+    """
+    Routes the nets of the design in a pool of threads, with the options of
+    maze_routing_net.
+
+    The nets are grouped into batches with non-overlapping bounding boxes,
+    and the nets of each batch are shared among the threads, which route
+    them on the design itself without updating the usage of its bins. The
+    usage is updated afterwards in the order of the design's nets, giving
+    the same result as routing them serially.
+
+    Returns the number of bins explored.
+    """
+    nets = design.core.nets
+    batches = _group_nets_by_bounding_box(nets)
+    routingLogger.debug(
+        f"Routing {len(nets)} nets in {len(batches)} batches with "
+        f"{threads} threads"
+    )
+
+    def _route_nets(batchNets:list[Net]) -> int:
+        explored = 0
+        for net in batchNets:
+            net.routedBins = None
+            explored += maze_routing_net(
+                net, design, updateBins=False, **netOptions)
+        return explored
+    # End of inner function
+
+    explored = 0
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for batch in batches:
+            chunkSize = -(-len(batch) // threads)
+            chunks = [
+                batch[i:i + chunkSize]
+                for i in range(0, len(batch), chunkSize)
+            ]
+            explored += sum(executor.map(_route_nets, chunks))
+        # End of for
+    # End of with
+
+    for net in nets:
+        if net.routedBins is None:
+            continue
+        for bin in net.routedBins:
+            design.bins[bin] += 1
+    # End of for
+
+    return explored
+# End of function
+
+def _merge_routed_net(
+    design:Design, net:Net,
+    result:tuple[
+        list[str], CompactNetTree, list[tuple[int,int]], int, list[str]
+    ],
+    compactTree:bool = False
+) -> int:
+    """
+    Stores the result of routing the net in a worker process to the net and
+    the usage of the bins of the design. The tree of the net is created
+    from the compact tree of the result, with the endpoints of the design,
+    unless compactTree is set.
+
+    Returns the number of bins explored.
+    """
+    drainOrder, connectionsTree, routedBins, explored, failedEndpoints = result
+
+    positions = {name: i for i, name in enumerate(drainOrder)}
+    net.drain.sort(key=lambda endpoint: positions[endpoint.name])
+    net.failedEndpoints = failedEndpoints
+
+    if connectionsTree is None:
+        return explored
+
+    if compactTree:
+        net.compactTree = connectionsTree
+    else:
+        endpoints = {endpoint.name: endpoint for endpoint in net.drain}
+        endpoints[net.source.name] = net.source
+        net.connectionsTree = connectionsTree.to_tree(endpoints)
+    net.routedBins = routedBins
+    # The layered engine never routes in worker processes
+    net.routedLayerBins = []
+    for bin in routedBins:
+        design.bins[bin] += 1
+
+    return explored
+# End of function
+
+def _tiled_maze_routing(
+    design:Design, jobs:int, tileSize:int, halo:int, netOptions:dict
+) -> int:
+    """
+    Routes the nets of the design on tiles of the bins grid, with the
+    options of maze_routing_net.
+
+    The grid is cut into square tiles of tileSize bins. Each net whose bins
+    all lie in one tile is routed by a worker process, searching only the
+    tile extended by a halo of bins on every side. The nets crossing tiles,
+    and those not completed in the window of their tile, are then routed
+    on the whole grid.
+
+    Returns the number of bins explored.
+    """
+    height, width = design.bins.size
+    tiles:dict[tuple[int,int], list[Net]] = {}
+    crossingNets = 0
+
+    for net in design.core.nets:
+        yMin, yMax, xMin, xMax = calculate_net_bins_bb(net)
+        tile = (yMin // tileSize, xMin // tileSize)
+        if (tile == (yMax // tileSize, xMax // tileSize)):
+            tiles.setdefault(tile, []).append(net)
+        else:
+            crossingNets += 1
+    # End of for
+
+    routingLogger.debug(
+        f"Routing {len(design.core.nets) - crossingNets} nets in "
+        f"{len(tiles)} tiles with {jobs} jobs, {crossingNets} nets "
+        "cross tiles"
+    )
+
+    # The workers attach to the bins of the routing copy in shared memory
+    routingDesign = design.routing_copy(shared=True)
+    results:dict[str, tuple] = {}
+    try:
+        with ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_initialize_routing_worker,
+            initargs=(routingDesign,)
+        ) as executor:
+            futures = {}
+            for (row, column), tileNets in tiles.items():
+                window = (
+                    max(row * tileSize - halo, 0),
+                    min((row + 1) * tileSize + halo, height) - 1,
+                    max(column * tileSize - halo, 0),
+                    min((column + 1) * tileSize + halo, width) - 1
+                )
+                futures[(row, column)] = executor.submit(
+                    _route_nets_in_worker,
+                    [net.routing_copy() for net in tileNets], netOptions,
+                    window
+                )
+            # End of for
+
+            for tile, future in futures.items():
+                for net, result in zip(tiles[tile], future.result()):
+                    results[net.name] = result
+        # End of with
+    finally:
+        routingDesign.detach_bins()
+
+    # Merge the nets completed in their tile, in the order of the nets
+    explored = 0
+    globalNets:list[Net] = []
+    for net in design.core.nets:
+        if net.name not in results:
+            globalNets.append(net)
+            continue
+
+        if not _is_net_completed(
+            design, net, results[net.name][2], results[net.name][4],
+            netOptions["components"]
+        ):
+            explored += results[net.name][3]
+            globalNets.append(net)
+            continue
+
+        explored += _merge_routed_net(
+            design, net, results[net.name],
+            netOptions.get("compactTree", False)
+        )
+    # End of for
+
+    # The global pass
+    routingLogger.debug(f"Routing {len(globalNets)} nets on the whole grid")
+    for net in globalNets:
+        explored += maze_routing_net(net, design, **netOptions)
+
+    return explored
+# End of function
+
+def _is_net_completed(
+    design:Design, net:Net, routedBins:list[tuple[int,int]],
+    failedEndpoints:list[str], components:np.ndarray
+) -> bool:
+    """
+    Returns whether the routing of the net connected all of its endpoints
+    that routing it on the whole grid could: those not in blockages and in
+    the connected component of free bins of the first routed bin, as given
+    by calculate_free_components
+    """
+    if routedBins is None:
+        return False
+
+    failed = set(failedEndpoints)
+    startComponent = components[routedBins[0]]
+    return all(
+        (design.blockages[endpoint.bin] != 0)
+        | (components[endpoint.bin] != startComponent)
+        for endpoint in [net.source] + net.drain
+        if endpoint.name in failed
+    )
+# End of function
+
+def _coarse_free_bins(design:Design, factor:int) -> np.ndarray:
+    """
+    Pools the blockages into a grid coarser by the given factor, where a
+    coarse bin is free unless all of its bins are blocked
+    """
+    height, width = design.bins.size
+    blocked = np.pad(
+        design.blockages.bins != 0,
+        ((0, -height % factor), (0, -width % factor)),
+        constant_values=True
+    )
+    coarseHeight = blocked.shape[0] // factor
+    coarseWidth = blocked.shape[1] // factor
+
+    return ~blocked.reshape(
+        coarseHeight, factor, coarseWidth, factor).all(axis=(1, 3))
+# End of function
+
+def _coarse_corridor(
+    net:Net, design:Design, coarseFreeBins:np.ndarray, factor:int,
+    startRoutingFromCenter:bool, clockwiseRouting:bool
+) -> tuple[np.ndarray, int]:
+    """
+    Routes the net with Lee's wave on the coarse grid.
+
+    Returns the corridor of the bins of the fine grid in and around the
+    coarse route, and the number of coarse bins explored.
+    """
+    if startRoutingFromCenter:
+        startBin = design.find_bin(calculate_bb_center(net))
+    else:
+        startBin = net.source.bin
+    start = (startBin[0] // factor, startBin[1] // factor)
+
+    coarseBins = [start]
+    coarseMask = np.zeros(coarseFreeBins.shape, dtype=bool)
+    coarseMask[start] = True
+
+    explored = 0
+    endpoints = sorted(
+        [net.source] + net.drain,
+        key=lambda endpoint: (startBin[0] - endpoint.bin[0])**2
+                             + (startBin[1] - endpoint.bin[1])**2
+    )
+    for endpoint in endpoints:
+        drain = (endpoint.bin[0] // factor, endpoint.bin[1] // factor)
+        path, searched = _lee_wave_search(
+            coarseFreeBins, coarseBins, coarseMask, drain, clockwiseRouting)
+        explored += searched
+        if path is None:
+            continue
+
+        for bin in path[:-1]:
+            coarseBins.append(bin)
+            coarseMask[bin] = True
+    # End of for
+
+    corridor = coarseMask
+    for _ in range(CORRIDOR_MARGIN):
+        grown = corridor.copy()
+        grown[1:, :] |= corridor[:-1, :]
+        grown[:-1, :] |= corridor[1:, :]
+        grown[:, 1:] |= corridor[:, :-1]
+        grown[:, :-1] |= corridor[:, 1:]
+        corridor = grown
+    # End of for
+
+    height, width = design.bins.size
+    corridor = corridor.repeat(factor, axis=0).repeat(factor, axis=1)
+
+    return corridor[:height, :width], explored
+# End of function
+
+def _hierarchical_maze_routing(
+    design:Design, factor:int, netOptions:dict
+) -> int:
+    """
+    Routes the nets of the design from a coarse to the fine grid, with the
+    options of maze_routing_net.
+
+    Each net is first routed on a grid coarser by the given factor, and then
+    on the fine grid inside the corridor around its coarse route. The nets
+    not completed inside their corridor are ripped up and routed on the
+    whole grid, unless their endpoints left are in blockages or walled off,
+    so that the whole grid would not connect them either.
+
+    Returns the number of bins explored.
+    """
+    coarseFreeBins = _coarse_free_bins(design, factor)
+    routingLogger.debug(
+        f"Coarse grid of {coarseFreeBins.shape} bins, factor {factor}")
+
+    explored = 0
+    reroutedNets = 0
+    for net in design.core.nets:
+        corridor, coarseExplored = _coarse_corridor(
+            net, design, coarseFreeBins, factor,
+            netOptions["startRoutingFromCenter"],
+            netOptions["clockwiseRouting"]
+        )
+        explored += coarseExplored
+
+        net.routedBins = None
+        explored += maze_routing_net(
+            net, design, corridor=corridor, **netOptions)
+        if (
+            (net.routedBins is None)
+            or _is_net_completed(
+                design, net, net.routedBins, net.failedEndpoints,
+                netOptions["components"]
+            )
+        ):
+            continue
+
+        # Rip up and route on the whole grid
+        for bin in net.routedBins:
+            design.bins[bin] -= 1
+        for bin in net.routedLayerBins:
+            design.layerBins[bin] -= 1
+        net.connectionsTree = None
+        net.routedBins = None
+        reroutedNets += 1
+
+        explored += maze_routing_net(net, design, **netOptions)
+    # End of for
+
+    routingLogger.debug(
+        f"{reroutedNets} nets were routed outside their corridor")
+
+    return explored
 # End of function
 
 
+def negotiated_congestion_routing(
+    design:Design, capacity:int = 1, maxIterations:int = 10,
+    startRoutingFromCenter:bool = False, clockwiseRouting:bool = True,
+    presentFactor:float = 0.5, presentFactorGrowth:float = 2,
+    historyFactor:float = 1
+) -> bool:
+    """
+    Negotiated congestion routing (PathFinder)
+
+    On every iteration each net is ripped up and rerouted with Dijkstra's
+    search, where entering a bin costs its history cost times its present
+    congestion cost, as given by the usage of the bins by the rest of the
+    nets. The present congestion cost grows with every iteration, while the
+    history cost of the bins used over their capacity accumulates, so nets
+    negotiate the bins until none of them is over its capacity.
+
+    Returns True if the routing converged without overflow.
+    """
+
+    if (design.isRouted):
+        routingLogger.info("Design is already routed!")
+        return False
+
+    history = np.ones(design.bins.size)
+    components = calculate_free_components(design)
+
+    def _update_costs(bins:list[tuple[int,int]]) -> None:
+        """Updates the costs of entering the bins to their present usage"""
+        for bin in bins:
+            overuse = max(design.bins[bin] + 1 - capacity, 0)
+            costs[bin] = history[bin] * (1 + presentFactor * overuse)
+    # End of inner function
+
+    for iteration in range(1, maxIterations + 1):
+        startTime = time.perf_counter()
+
+        # Only the bins of the net rerouted change cost during an iteration
+        overuse = np.maximum(design.bins.bins + 1 - capacity, 0)
+        costs = history * (1 + presentFactor * overuse)
+
+        for net in design.core.nets:
+            # Rip-up
+            if net.routedBins is not None:
+                for bin in net.routedBins:
+                    design.bins[bin] -= 1
+                _update_costs(net.routedBins)
+                net.routedBins = None
+            net.connectionsTree = None
+
+            maze_routing_net(
+                net, design, startRoutingFromCenter, clockwiseRouting,
+                costs=costs, components=components
+            )
+            if net.routedBins is not None:
+                _update_costs(net.routedBins)
+        # End of for
+
+        overflow = np.maximum(design.bins.bins - capacity, 0)
+        routingLogger.info(
+            f"Iteration {iteration}: overflow {overflow.sum():.0f} in "
+            f"{np.count_nonzero(overflow)} bins, "
+            f"{time.perf_counter() - startTime:.3f}s"
+        )
+
+        if (overflow.sum() == 0):
+            break
+
+        history += historyFactor * overflow
+        presentFactor *= presentFactorGrowth
+    # End of for
+
+    design.isRouted = True
+    _queue_failed_nets(design)
+    if (overflow.sum() != 0):
+        routingLogger.warning(
+            f"Routing did not converge after {maxIterations} iterations")
+        return False
+
+    routingLogger.info("Routing converged without overflow")
+    return True
+# End of function
+
 def calculate_bb_center(net:Net) -> tuple[float, float]:
     """
     Calculates and returns the center of the bounding box for the given net.
@@ -623,6 +3612,24 @@ def calculate_bb_center(net:Net) -> tuple[float, float]:
     return (xCenter, yCenter)
 # End of function
 
+def calculate_net_bins_bb(net:Net) -> tuple[int, int, int, int]:
+    """
+    Calculates and returns the bounding box of the bins of the given net,
+    as (yMin, yMax, xMin, xMax).
+    """
+    yMin, xMin = net.source.bin
+    yMax, xMax = yMin, xMin
+
+    for endpoint in net.drain:
+        ey, ex = endpoint.bin
+        yMin = min(yMin, ey)
+        yMax = max(yMax, ey)
+        xMin = min(xMin, ex)
+        xMax = max(xMax, ex)
+
+    return (yMin, yMax, xMin, xMax)
+# End of function
+
 def calculate_net_HPWL(net:Net) -> float:
     """
     Calculates the net wirelength based on its bounding box.
@@ -690,6 +3697,8 @@ def calculate_net_tree_wirelength(net:Net) -> float:
         return result
     # End of inner function
 
+    if (net.compactTree is not None):
+        return net.compactTree.wirelength()
     return _recursive_calculate_wirelength(net.connectionsTree)
 # End of function
 
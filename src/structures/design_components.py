@@ -10,6 +10,9 @@ __license__ = "MIT License"
 __version__ = "1.0"
 
 import logging
+import math
+import threading
+from multiprocessing import shared_memory
 
 import numpy as np
 from numpy import ndarray
@@ -188,6 +191,11 @@ class Pin:
     pass
 
 
+# Definition of class Component for usage in class Component
+class Component:
+    pass
+
+
 # Class Component
 class Component(RectangleDesignElement):
     """A class used to represent a component of the design"""
@@ -275,6 +283,21 @@ class Component(RectangleDesignElement):
     def add_pin(self, name:str, type:str="Input", function:str=None) -> None:
         self._pins.append(Pin(name, self, type,function))
     # End of method
+
+    def routing_copy(self) -> Component:
+        """
+        Returns a copy of the component with only what routing needs: its
+        name, location, dimensions and bin, without its pins
+        """
+        component = Component(
+            self._name, self._type, self._timingType,
+            self._width, self._height
+        )
+        component._x = self._x
+        component._y = self._y
+        component._bin = self._bin
+        return component
+    # End of method
 # End of class
 
 
@@ -354,16 +377,249 @@ class NetPoint(BaseDesignElement):
 class NetTreeNode:
     pass
 
+class NetTreeIndex:
+    """
+    A class used to index the nodes of a net tree while it is built
+
+    The nodes are kept by the bin of their point, and in a uniform grid of
+    the size of the bins by the coordinates of their point. The nodes on a
+    bin are looked up, and the node nearest to a point is searched in the
+    cells around it, in rings growing until no nearer node can be left.
+    Removed subtrees are only dropped from the index before the next
+    search, so a subtree moved, removed and added again, stays indexed.
+    """
+
+    _root:NetTreeNode = None
+    """The root of the indexed tree"""
+
+    _binSize:tuple[float,float] = None
+    """Width and height of the cells of the grid"""
+
+    _binNodes:dict[tuple[int,int], list[NetTreeNode]] = None
+    """The nodes on each bin"""
+
+    _cellNodes:dict[tuple[int,int], list[NetTreeNode]] = None
+    """The nodes in each cell of the grid"""
+
+    _entries:dict[NetTreeNode, tuple] = None
+    """The bin, the cell and the coordinates (x,y) each node is kept by"""
+
+    _cellBounds:list[int] = None
+    """Bounds (yMin, yMax, xMin, xMax) of the cells with nodes"""
+
+    _detached:set[NetTreeNode] = None
+    """Roots of the subtrees removed, while they are not added again"""
+
+    _preorderKeys:dict[NetTreeNode, tuple[int, ...]] = None
+    """Positions of the nodes in preorder, until the tree changes"""
+
+    def __init__(self, root:NetTreeNode, binSize:tuple[float,float]) -> None:
+        self._root = root
+        self._binSize = binSize
+        self._binNodes = {}
+        self._cellNodes = {}
+        self._entries = {}
+        self._cellBounds = None
+        self._detached = set()
+        self._preorderKeys = {}
+        self.add(root)
+    # End of method
+
+    @property
+    def root(self) -> NetTreeNode:
+        return self._root
+    # End of method
+
+    def _cell(self, coordinates:tuple[float,float]) -> tuple[int,int]:
+        """Returns the cell (y,x) of the grid of the coordinates"""
+        return (
+            math.floor(coordinates[1] / self._binSize[1]),
+            math.floor(coordinates[0] / self._binSize[0])
+        )
+    # End of method
+
+    def _insert(self, node:NetTreeNode) -> None:
+        """Keeps the node by the bin and the coordinates of its point"""
+        coordinates = node.point.get_coordinates()
+        cell = self._cell(coordinates)
+        self._entries[node] = (node.point.bin, cell, coordinates)
+        self._binNodes.setdefault(node.point.bin, []).append(node)
+        self._cellNodes.setdefault(cell, []).append(node)
+
+        if self._cellBounds is None:
+            self._cellBounds = [cell[0], cell[0], cell[1], cell[1]]
+        else:
+            bounds = self._cellBounds
+            bounds[0] = min(bounds[0], cell[0])
+            bounds[1] = max(bounds[1], cell[0])
+            bounds[2] = min(bounds[2], cell[1])
+            bounds[3] = max(bounds[3], cell[1])
+    # End of method
+
+    def _discard(self, node:NetTreeNode) -> None:
+        """Drops the node from the bin and the cell it is kept by"""
+        bin, cell, _ = self._entries.pop(node)
+        self._binNodes[bin].remove(node)
+        self._cellNodes[cell].remove(node)
+    # End of method
+
+    def add(self, node:NetTreeNode) -> None:
+        """Adds the node and its subtree to the index"""
+        self._preorderKeys.clear()
+        if node in self._detached:
+            # Moved, its subtree is still indexed
+            self._detached.discard(node)
+            return
+
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node in self._entries:
+                continue
+            self._insert(node)
+            node._index = self
+            stack.extend(node.children)
+        # End of while
+    # End of method
+
+    def detach(self, node:NetTreeNode) -> None:
+        """Marks the subtree of the node as removed from the tree"""
+        self._preorderKeys.clear()
+        if node in self._entries:
+            self._detached.add(node)
+    # End of method
+
+    def _drop_detached(self) -> None:
+        """Drops the subtrees removed and not added again from the index"""
+        while self._detached:
+            stack = [self._detached.pop()]
+            while stack:
+                node = stack.pop()
+                if node not in self._entries:
+                    continue
+                self._discard(node)
+                node._index = None
+                stack.extend(node.children)
+            # End of while
+        # End of while
+    # End of method
+
+    def update(self, node:NetTreeNode) -> None:
+        """Updates the bin and the coordinates of the point of the node"""
+        self._discard(node)
+        self._insert(node)
+    # End of method
+
+    def _preorder_key(self, node:NetTreeNode) -> tuple[int, ...]:
+        """
+        Returns the positions of the ancestors of the node and of the node
+        among their siblings, from the root down, which order the nodes in
+        preorder
+        """
+        keys = self._preorderKeys
+        path = []
+        while ((node not in keys) and (node is not self._root)):
+            path.append(node)
+            node = node.parent
+        key = keys.get(node, ())
+
+        for node in reversed(path):
+            key = key + (node.parent.children.index(node),)
+            keys[node] = key
+        return key
+    # End of method
+
+    def points_on_bin(self, bin:tuple[int,int]) -> list[NetTreeNode]:
+        """Returns the nodes on the bin, in preorder"""
+        self._drop_detached()
+        nodes = list(self._binNodes.get(bin, []))
+        if (len(nodes) > 1):
+            nodes.sort(key=self._preorder_key)
+        return nodes
+    # End of method
+
+    def nearest(self, destination:tuple[float,float]) -> NetTreeNode:
+        """
+        Returns the node whose point is nearest to the destination, the
+        first in preorder among equally near nodes.
+
+        The rings of cells around the cell of the destination are searched
+        until the next ring is farther than the nearest node found, or have
+        more cells than the nodes, which are then all compared.
+        """
+        self._drop_detached()
+        dx, dy = destination
+        cy, cx = self._cell(destination)
+        yMin, yMax, xMin, xMax = self._cellBounds
+        # The points of a ring are at least one cell less than it away
+        step = min(self._binSize)
+
+        nearest:list[NetTreeNode] = []
+        shortestDist = math.inf
+
+        def _compare(nodes) -> None:
+            nonlocal nearest, shortestDist
+            for node in nodes:
+                x, y = self._entries[node][2]
+                distance = (x - dx)**2 + (y - dy)**2
+                if (distance < shortestDist):
+                    shortestDist = distance
+                    nearest = [node]
+                elif (distance == shortestDist):
+                    nearest.append(node)
+        # End of inner function
+
+        firstRing = max(0, yMin - cy, cy - yMax, xMin - cx, cx - xMax)
+        lastRing = max(cy - yMin, yMax - cy, cx - xMin, xMax - cx)
+        visited = 0
+        for ring in range(firstRing, lastRing + 1):
+            if (
+                (len(nearest) != 0)
+                and (((ring - 1) * step)**2 > shortestDist * (1 + 1e-9))
+            ):
+                break
+            if (visited > len(self._entries)):
+                nearest = []
+                shortestDist = math.inf
+                _compare(self._entries)
+                break
+
+            for y in range(max(cy - ring, yMin), min(cy + ring, yMax) + 1):
+                if ((y == cy - ring) or (y == cy + ring)):
+                    columns = range(
+                        max(cx - ring, xMin), min(cx + ring, xMax) + 1)
+                else:
+                    columns = [
+                        x for x in (cx - ring, cx + ring)
+                        if (xMin <= x <= xMax)
+                    ]
+                for x in columns:
+                    visited += 1
+                    _compare(self._cellNodes.get((y, x), ()))
+            # End of for
+        # End of for
+
+        if (len(nearest) > 1):
+            return min(nearest, key=self._preorder_key)
+        return nearest[0]
+    # End of method
+# End of class
+
 class NetTreeNode(GenericTreeNode):
     """
     A class used to represent the shape of the net after the routing
 
     The net is a tree with its source as its root and the leaves been the
-    endpoints
+    endpoints. While the tree is built, its root may index its nodes, as
+    they are added and removed, to find the points on a bin and the nearest
+    point.
     """
 
     _point:(IOPort|Component|NetPoint)
 
+    _index:NetTreeIndex = None
+    """Index of the tree the node is in"""
+
     def __init__(
             self, name:str,
             point:(IOPort|Component|NetPoint),
@@ -376,13 +632,81 @@ class NetTreeNode(GenericTreeNode):
     def __repr__(self) -> str:
         return f"{self._name}"
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # The index only serves the routing of the net
+        state.pop("_index", None)
+        return state
+    # End of method
+
     @property
     def point(self) -> (IOPort|Component|NetPoint):
         """"""
         return self._point
     # End of method
 
+    @point.setter
+    def point(self, newPoint:(IOPort|Component|NetPoint)) -> None:
+        self._point = newPoint
+        self.point_moved()
+    # End of method
+
+    def point_moved(self) -> None:
+        """
+        Updates the index of the tree after the coordinates or the bin of
+        the point of the node change
+        """
+        if self._index is not None:
+            self._index.update(self)
+    # End of method
+
+    def add_child(self, child:NetTreeNode) -> None:
+        super().add_child(child)
+        if self._index is not None:
+            self._index.add(child)
+    # End of method
+
+    def remove_child(self, child:NetTreeNode) -> bool:
+        if not super().remove_child(child):
+            return False
+
+        if self._index is not None:
+            self._index.detach(child)
+        return True
+    # End of method
+
+    def index_tree(self, binSize:tuple[float,float]) -> None:
+        """
+        Indexes the tree rooted on the node, with cells of the given size
+        (width, height), for the searches of its points
+        """
+        NetTreeIndex(self, binSize)
+    # End of method
+
+    def drop_index(self) -> None:
+        """Drops the index of the tree rooted on the node"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node._index = None
+            stack.extend(node.children)
+    # End of method
+
+    def _tree_index(self) -> (NetTreeIndex | None):
+        """
+        Returns the index of the tree rooted on the node, or None if the
+        tree is not indexed or the node is not its root
+        """
+        if ((self._index is None) or (self._index.root is not self)):
+            return None
+        return self._index
+    # End of method
+
     def find_points_on_bin(self, bin:tuple[int,int]):
+        index = self._tree_index()
+        if index is not None:
+            return index.points_on_bin(bin)
+
         def _recursive_search(node:NetTreeNode):
             if bin == node.point.bin:
                 result = [node]
@@ -398,6 +722,10 @@ class NetTreeNode(GenericTreeNode):
     # End of method
 
     def find_nearest_tree_node(self, destination:tuple[float,float]):
+        index = self._tree_index()
+        if index is not None:
+            return index.nearest(destination)
+
         def _distance(point:tuple[float,float]):
             distance = (point[0] - destination[0])**2 \
                        + (point[1] - destination[1])**2
@@ -440,6 +768,148 @@ class NetTreeNode(GenericTreeNode):
 # End of class
 
 
+# Class CompactNetTree
+class CompactNetTree:
+    """
+    A class used to store the routed tree of a net in an array
+
+    The nodes are stored in preorder, each with the index of its parent,
+    the coordinates of its point, or of its center for components, and its
+    bin. The endpoints of the net are kept by name, and the points and the
+    nodes are created again, with their names, when the tree is asked for.
+    """
+
+    NODE_DTYPE = np.dtype([
+        ("parent", np.int32),
+        ("x", np.float64),
+        ("y", np.float64),
+        ("binY", np.int32),
+        ("binX", np.int32),
+        ("number", np.int32)
+    ])
+    """Fields of a node: the index of its parent, -1 for the root, the
+    coordinates and the bin of its point, and the number of the name of
+    the point, -1 if it is not numbered after the net"""
+
+    _netName:str = None
+
+    _nodes:ndarray = None
+    """The nodes in preorder"""
+
+    _names:dict[int, str] = None
+    """Names of the endpoints and of the points not numbered after the net"""
+
+    def __init__(self, netName:str, tree:NetTreeNode) -> None:
+        self._netName = netName
+        self._names = {}
+
+        nodes = []
+        prefix = f"{netName}_"
+
+        stack = [(tree, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = len(nodes)
+            point = node.point
+            x, y = get_center_coordinates(point)
+
+            number = -1
+            if (
+                (point.__class__.__name__ == "NetPoint")
+                and point.name.startswith(prefix)
+                and point.name[len(prefix):].isdecimal()
+            ):
+                number = int(point.name[len(prefix):])
+            else:
+                self._names[index] = point.name
+            nodes.append((parent, x, y, *point.bin, number))
+
+            # Reversed, so that the children are popped in their order
+            for child in reversed(node.children):
+                stack.append((child, index))
+        # End of while
+
+        self._nodes = np.array(nodes, dtype=self.NODE_DTYPE)
+    # End of method
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+    # End of method
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # The raw bytes of the nodes are faster to pickle than the array
+        state["_nodes"] = self._nodes.tobytes()
+        return state
+    # End of method
+
+    def __setstate__(self, state:dict) -> None:
+        state["_nodes"] = np.frombuffer(
+            state["_nodes"], dtype=self.NODE_DTYPE).copy()
+        self.__dict__.update(state)
+    # End of method
+
+    @property
+    def nodes(self) -> ndarray:
+        return self._nodes
+    # End of method
+
+    def to_tree(
+            self, endpoints:dict[str, IOPort|Component]
+        ) -> NetTreeNode:
+        """
+        Creates the tree of nodes stored, with the given endpoints of the
+        net by name
+        """
+        treeNodes:list[NetTreeNode] = []
+
+        for index, (parent, x, y, binY, binX, number) in enumerate(
+            self._nodes.tolist()
+        ):
+            if (number >= 0):
+                point = NetPoint(f"{self._netName}_{number}", x, y)
+                point.bin = (binY, binX)
+            elif self._names[index] in endpoints:
+                point = endpoints[self._names[index]]
+            else:
+                point = NetPoint(self._names[index], x, y)
+                point.bin = (binY, binX)
+
+            node = NetTreeNode(point.name, point)
+            if (parent >= 0):
+                treeNodes[parent].add_child(node)
+            treeNodes.append(node)
+        # End of for
+
+        return treeNodes[0]
+    # End of method
+
+    def wirelength(self) -> float:
+        """
+        Returns the wirelength of the tree, where each node is connected to
+        its parent vertically if they are on the same column, otherwise
+        horizontally
+        """
+        if (len(self._nodes) < 2):
+            return 0
+
+        child = self._nodes[1:]
+        parent = self._nodes[child["parent"]]
+        lengths = np.where(
+            child["x"] == parent["x"],
+            np.abs(child["y"] - parent["y"]),
+            np.abs(child["x"] - parent["x"])
+        )
+        return float(lengths.sum())
+    # End of method
+# End of class
+
+
+# Definition of class Net for usage in class Net
+class Net:
+    pass
+
+
 # Class Net
 class Net:
     """
@@ -451,7 +921,14 @@ class Net:
     _source: (IOPort | Component)= None
     _drain: list[IOPort | Component] = []
 
-    connectionsTree: NetTreeNode = None
+    _connectionsTree: NetTreeNode = None
+    _compactTree: CompactNetTree = None
+    routedBins: list[tuple[int,int]] = None
+    """Bins used by the routed net"""
+    routedLayerBins: list[tuple[int,int,int]] = None
+    """Bins of the layers (layer,y,x) used by the net routed on layers"""
+    failedEndpoints: list[str] = None
+    """Names of the endpoints the routing could not connect to the net"""
 
     def __init__(
             self, name:str, source:(IOPort|Component),
@@ -462,6 +939,14 @@ class Net:
         self._drain = drain
     # End of method
 
+    def __setstate__(self, state:dict) -> None:
+        # Designs saved before the trees were kept behind a property store
+        # the tree as connectionsTree
+        if "connectionsTree" in state:
+            state["_connectionsTree"] = state.pop("connectionsTree")
+        self.__dict__.update(state)
+    # End of method
+
     def __repr__(self):
         drain = " ".join([d.name for d in self._drain])
         rep_str = f"Net: {self._name} Source: {self._source.name} " \
@@ -485,6 +970,69 @@ class Net:
     def drain(self):
         return self._drain
     # End of method
+
+    @property
+    def connectionsTree(self) -> (NetTreeNode | None):
+        """
+        Returns the routed tree of the net, created from its compact tree
+        if the net is compacted. Such a tree is created anew on every call
+        and is read-only, changes to it are not kept in the compact tree.
+        """
+        if (self._compactTree is not None):
+            endpoints = {endpoint.name: endpoint for endpoint in self._drain}
+            endpoints[self._source.name] = self._source
+            return self._compactTree.to_tree(endpoints)
+        return self._connectionsTree
+    # End of method
+
+    @connectionsTree.setter
+    def connectionsTree(self, newTree:(NetTreeNode | None)) -> None:
+        self._connectionsTree = newTree
+        self._compactTree = None
+    # End of method
+
+    @property
+    def compactTree(self) -> (CompactNetTree | None):
+        """Returns the routed tree of the net stored in arrays"""
+        return self._compactTree
+    # End of method
+
+    @compactTree.setter
+    def compactTree(self, newTree:(CompactNetTree | None)) -> None:
+        self._compactTree = newTree
+        self._connectionsTree = None
+    # End of method
+
+    def compact_tree(self) -> None:
+        """Stores the routed tree of the net in arrays, dropping its nodes"""
+        if (self._connectionsTree is not None):
+            self.compactTree = CompactNetTree(
+                self._name, self._connectionsTree)
+    # End of method
+
+    def routing_copy(self) -> Net:
+        """
+        Returns a copy of the net, not routed, for routing it in another
+        process, with routing copies of its components
+        """
+        # An endpoint in both the source and the drain gets one copy
+        copies:dict[int, Component] = {}
+
+        def _endpoint_copy(
+                endpoint:(IOPort | Component)
+            ) -> (IOPort | Component):
+            if (endpoint.__class__.__name__ != "Component"):
+                return endpoint
+            if id(endpoint) not in copies:
+                copies[id(endpoint)] = endpoint.routing_copy()
+            return copies[id(endpoint)]
+        # End of inner function
+
+        return Net(
+            self._name, _endpoint_copy(self._source),
+            [_endpoint_copy(endpoint) for endpoint in self._drain]
+        )
+    # End of method
 # End of class
 
 
@@ -642,22 +1190,105 @@ class Core(RectangleDesignElement):
 
 # Class Bins
 class Bins:
-    """ A class used to represent the bins used for routing"""
+    pass
+
+class Bins:
+    """
+    A class used to represent the bins used for routing
+
+    The array of bins may have a layer dimension before the rows and the
+    columns. It may live in shared memory, so that worker processes use it
+    without copying it. The bins creating the shared memory own it
+    and unlink it on detach(). Bins attached to it, with attach() or by
+    unpickling shared bins, only close it on detach().
+    """
 
     _bins:ndarray = None
     """The array of bins"""
     
     _size:tuple[int,int] = None
-    """The size of the bins array (y,x)"""
+    """The size of the bins array (y,x), or (layer,y,x) with layers"""
 
-    def __init__(self, width:int, height:int) -> None:
-        self._size = (height, width)
-        self._bins = np.zeros(self._size)
+    _sharedMemory:shared_memory.SharedMemory = None
+    """The shared memory holding the array of bins, if shared"""
+
+    _isOwner:bool = False
+    """Whether the bins created, and have to unlink, their shared memory"""
+
+    def __init__(
+        self, width:int, height:int, shared:bool = False, layers:int = 0
+    ) -> None:
+        self._size = (height, width) if (layers == 0) \
+                     else (layers, height, width)
+        if shared:
+            self._sharedMemory = shared_memory.SharedMemory(
+                create=True,
+                size=int(np.prod(self._size)) * np.dtype(np.float64).itemsize
+            )
+            self._isOwner = True
+            self._bins = np.ndarray(
+                self._size, dtype=np.float64, buffer=self._sharedMemory.buf)
+            self._bins[:] = 0
+        else:
+            self._bins = np.zeros(self._size)
     # End of method
 
     def __repr__(self) -> str:
         return f"Bins {self.size}:\n{self._bins}"
     # End of method
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        if self._sharedMemory is not None:
+            # Shared bins are pickled by the name of their memory
+            del state["_bins"]
+            state["_sharedMemory"] = self._sharedMemory.name
+            state["_isOwner"] = False
+        return state
+    # End of method
+
+    def __setstate__(self, state:dict) -> None:
+        self.__dict__.update(state)
+        if self._sharedMemory is not None:
+            self._attach_shared_memory(self._sharedMemory)
+    # End of method
+
+    @staticmethod
+    def attach(name:str, width:int, height:int, layers:int = 0) -> Bins:
+        """
+        Returns bins using the array of the shared memory with the given
+        name, without copying it
+        """
+        bins = Bins.__new__(Bins)
+        bins._size = (height, width) if (layers == 0) \
+                     else (layers, height, width)
+        bins._attach_shared_memory(name)
+        return bins
+    # End of method
+
+    def _attach_shared_memory(self, name:str) -> None:
+        """Uses the array of the shared memory with the given name"""
+        self._sharedMemory = shared_memory.SharedMemory(name=name)
+        self._isOwner = False
+        self._bins = np.ndarray(
+            self._size, dtype=np.float64, buffer=self._sharedMemory.buf)
+    # End of method
+
+    def detach(self) -> None:
+        """
+        Stops using the shared memory, keeping a private copy of the bins.
+        The shared memory is unlinked if these bins own it.
+        """
+        if self._sharedMemory is None:
+            return
+
+        self._bins = self._bins.copy()
+        self._sharedMemory.close()
+        if self._isOwner:
+            self._sharedMemory.unlink()
+        self._sharedMemory = None
+        self._isOwner = False
+    # End of method
     
     def __getitem__(self, index: tuple[int, int]) -> ndarray[int, int]:
         return self._bins[index]
@@ -669,7 +1300,7 @@ class Bins:
 
     @property
     def size(self) -> tuple[int, int]:
-        "Size of bins array (y,x)"
+        "Size of bins array (y,x), or (layer,y,x) with layers"
         return self._size
     # End of method
 
@@ -678,10 +1309,97 @@ class Bins:
         "Bins array"
         return self._bins
     # End of method
+
+    @property
+    def sharedName(self) -> (str | None):
+        "Name of the shared memory of the bins, None if not shared"
+        if self._sharedMemory is None:
+            return None
+        return self._sharedMemory.name
+    # End of method
+# End of class
+
+
+# Class RoutingWorkspace
+class RoutingWorkspace:
+    """
+    A class holding the scratch arrays of the routing searches, over the
+    flattened bins, reused from one search to the next
+
+    Each search has a new generation. The bins a search labels are stamped
+    with its generation, and those it closes with it in the closed stamps,
+    so only stamped bins hold a value and a predecessor of the search.
+    Starting a search increments the generation instead of clearing the
+    arrays. The arrays are Python lists and a bytearray, as the searches
+    access them one bin at a time.
+    """
+
+    _generation:int = 0
+    """Generation of the current search"""
+
+    _stamps:list[int] = None
+    """Generation of the search that last labelled each bin"""
+
+    _closedStamps:list[int] = None
+    """Generation of the search that last closed each bin"""
+
+    _values:list[float] = None
+    """Distance or cost of each bin from the net"""
+
+    _predecessor:bytearray = None
+    """Direction leading back to the net from each bin"""
+
+    def __init__(self) -> None:
+        self._allocate(0)
+    # End of method
+
+    def _allocate(self, size:int) -> None:
+        """Allocates cleared arrays for the given number of bins"""
+        self._generation = 0
+        self._stamps = [0] * size
+        self._closedStamps = [0] * size
+        self._values = [0] * size
+        self._predecessor = bytearray(size)
+    # End of method
+
+    def start_search(self, size:int) -> int:
+        """
+        Starts a search on the given number of bins, growing the arrays if
+        needed. Returns the generation of the search.
+        """
+        if (size > len(self._stamps)):
+            self._allocate(size)
+
+        self._generation += 1
+        return self._generation
+    # End of method
+
+    @property
+    def stamps(self) -> list[int]:
+        return self._stamps
+    # End of method
+
+    @property
+    def closedStamps(self) -> list[int]:
+        return self._closedStamps
+    # End of method
+
+    @property
+    def values(self) -> list[float]:
+        return self._values
+    # End of method
+
+    @property
+    def predecessor(self) -> bytearray:
+        return self._predecessor
+    # End of method
 # End of class
 
 
 # Class Design
+class Design:
+    pass
+
 class Design:
     """
     A class representing the whole design
@@ -690,11 +1408,14 @@ class Design:
     -------
     create_core(coreUtil, width, height, aspectRatio, xOffset, yOffset)
 
-    create_bins(width, height)
+    create_bins(width, height, shared, layers)
 
     find_bin(coords)
     """
 
+    ROUTING_LAYERS = 2
+    """Layers of a layered bins grid: a horizontal and a vertical one"""
+
     _name: str = None
     """Name of the design"""
     _comments: str = None
@@ -707,14 +1428,30 @@ class Design:
 
     _blockages: Bins = None
 
+    _layerBins: Bins = None
+    """Routing Bins of each layer, if the grid is layered"""
+
     _isRouted: bool = None
 
+    _failedNets: list[Net] = []
+    """Nets the routing could not complete, to be reported or retried"""
+
+    _workspaces: threading.local = None
+    """Routing workspace of each thread routing the design, freed with it"""
+
     def __init__(self, name:str, comments:str) -> None:
         self._name = name
         self._comments = comments
         self._isRouted = False
     # End of method
 
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        # The routing workspaces are scratch memory of this process
+        state.pop("_workspaces", None)
+        return state
+    # End of method
+
     def __repr__(self) -> str:
         repr = f"Design: {self._name}\n{self._comments}\n{self.core}\n"
         if self._bins:
@@ -751,16 +1488,40 @@ class Design:
         return self._blockages
     # End of method
 
+    @property
+    def layerBins(self) -> (Bins | None):
+        return self._layerBins
+    # End of method
+
     @property
     def isRouted(self) -> bool:
         return self._isRouted
     # End of method
 
+    @property
+    def binSize(self) -> tuple[float,float]:
+        """Returns the width and the height of the bins"""
+        binsSize = self._bins.size
+        binWidth = (self._core.width + 2 *self._core.x_offset) / binsSize[1]
+        binHeight = (self._core.height + 2 * self._core.y_offset) / binsSize[0]
+        return (binWidth, binHeight)
+    # End of method
+
     @isRouted.setter
     def isRouted(self, isRouted) -> None:
         self._isRouted = isRouted
     # End of method
 
+    @property
+    def failedNets(self) -> list[Net]:
+        return self._failedNets
+    # End of method
+
+    @failedNets.setter
+    def failedNets(self, failedNets:list[Net]) -> None:
+        self._failedNets = failedNets
+    # End of method
+
     def create_core(self, coreUtil: int, width: float, height: float,
                     aspectRatio: float, xOffset: float, yOffset: float) -> None:
         """Creates a core with the given specifications"""
@@ -768,23 +1529,85 @@ class Design:
                           aspectRatio, xOffset, yOffset)
     # End of method
 
-    def create_bins(self, width:int, height:int) -> None:
-        """Creates an array of bins with the given dimentions"""
-        self._bins = Bins(width, height)
-        self._componentBins = Bins(width, height)
+    def create_bins(
+        self, width:int, height:int, shared:bool = False, layers:int = 0
+    ) -> None:
+        """
+        Creates an array of bins with the given dimentions, in shared memory
+        if shared is set. With layers, the usage of the bins by the routing
+        is also kept for each layer, the routing bins holding their total.
+        A layered grid has ROUTING_LAYERS layers, the ones routing uses.
+        """
+        if (layers not in (0, self.ROUTING_LAYERS)):
+            raise ValueError(
+                f"A layered bins grid has {self.ROUTING_LAYERS} layers")
+
+        self._bins = Bins(width, height, shared)
+        self._componentBins = Bins(width, height, shared)
         self._update_bins()
         self._isRouted = False
 
-        self._blockages = Bins(width, height)
+        self._blockages = Bins(width, height, shared)
+        self._layerBins = Bins(width, height, shared, layers) \
+                          if (layers > 0) else None
     # End of method
 
     def remove_bins(self):
         """Removes bins from the design"""
+        self.detach_bins()
         del self._bins
         del self._componentBins
         del self._blockages
+        self._layerBins = None
+        self._failedNets = []
         self.isRouted = False
 
+    def routing_copy(self, shared:bool = False) -> Design:
+        """
+        Returns a copy of the design with only what routing nets needs:
+        the core, a copy of the blockages and empty routing bins, in shared
+        memory if shared is set. The copy owns its shared bins, which are
+        released with detach_bins().
+        """
+        height, width = self._bins.size
+
+        design = Design(self._name, self._comments)
+        design._core = self._core
+        design._bins = Bins(width, height, shared)
+        design._blockages = Bins(width, height, shared)
+        design._blockages.bins[:] = self._blockages.bins
+        if self._layerBins is not None:
+            design._layerBins = Bins(
+                width, height, shared, self._layerBins.size[0])
+
+        return design
+    # End of method
+
+    def routing_workspace(self) -> RoutingWorkspace:
+        """
+        Returns the routing workspace of the calling thread, created on its
+        first search, so that threads routing the design do not share one.
+        The workspace is freed when its thread ends.
+        """
+        if self._workspaces is None:
+            self._workspaces = threading.local()
+
+        workspace = getattr(self._workspaces, "workspace", None)
+        if workspace is None:
+            workspace = RoutingWorkspace()
+            self._workspaces.workspace = workspace
+        return workspace
+    # End of method
+
+    def detach_bins(self) -> None:
+        """Detaches the bins of the design from their shared memory"""
+        for bins in (
+            self._bins, self._componentBins, self._blockages, self._layerBins
+        ):
+            if bins is not None:
+                bins.detach()
+    # End of method
+
     def _update_bins(self):
         """Updates the component bins"""
         binsSize = self._bins.size
@@ -241,11 +241,13 @@ class GUI(Tk):
             # End if p2p
             else:
                 for net in self._design.core.nets:
-                    if (net.connectionsTree is None):
+                    # Compacted nets create their tree on every read
+                    connectionsTree = net.connectionsTree
+                    if (connectionsTree is None):
                         messagebox.showinfo("Tree view", 
                             f"There is no tree connection for net {net.name}")
                         continue
-                    self._recursive_net_drawing(net.connectionsTree)
+                    self._recursive_net_drawing(connectionsTree)
                 # End for loop
             # End else tree view
         # End if show nets
@@ -304,11 +306,12 @@ class GUI(Tk):
             # End for loop
         # End if
         else:
-            if not net.connectionsTree:
+            connectionsTree = net.connectionsTree
+            if not connectionsTree:
                 messagebox.showinfo("Tree view", 
                                 "There is no tree view. Run routing first!")
                 return
-            self._recursive_net_drawing(net.connectionsTree,
+            self._recursive_net_drawing(connectionsTree,
                                             color="red",tags="highlight")
         # End else
     # End of method
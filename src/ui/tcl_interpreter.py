@@ -29,6 +29,10 @@ from place_and_route.routing import maze_routing, calculate_tree_wirelength
 from place_and_route.routing import calculate_HPWL, calculate_net_HPWL
 from place_and_route.routing import calculate_net_tree_wirelength
 from place_and_route.routing import maze_routing_net
+from place_and_route.routing import ASTAR_ENGINE, BIDIRECTIONAL_ENGINE
+from place_and_route.routing import PATTERN_ENGINE, ROUTING_ENGINES
+from place_and_route.routing import negotiated_congestion_routing
+from place_and_route.routing import retry_failed_nets
 
 # Logging
 interfaceLogger = logging.getLogger(__name__)
@@ -190,6 +194,9 @@ class TclInterpreter:
         else:
             gridY, gridX = self._design.bins.size
             interfaceLogger.info(f"Grid size (X,Y): ({gridX}, {gridY})")
+            if self._design.layerBins is not None:
+                interfaceLogger.info(
+                    f"Routing layers: {self._design.layerBins.size[0]}")
     # End of method
 
 
@@ -227,7 +234,8 @@ class TclInterpreter:
         
     def _calculate_WL(self, *args):
         commandFormat = "calculate_WL [-h | -HPWL | -tree]"
-        commandDescription = "Calculates the wirelength of the design"
+        commandDescription = "Calculates the wirelength of the design, " \
+            "returned as the result of the command"
 
         if (len(args) == 1):
             if (args[0] == "-h"):
@@ -237,22 +245,28 @@ class TclInterpreter:
                 wpwl = calculate_HPWL(self._design)
                 interfaceLogger.info(
                     f"Design half-perimeter wirelength is: {wpwl:.3f}")
+                return wpwl
             elif (args[0] == "-tree"):
                 treeWL = calculate_tree_wirelength(self._design)
                 interfaceLogger.info(
                     f"Design routed wirelength is: {treeWL:.3f}")
+                return treeWL
         else:
             raise TclError
     # End of method
 
     def _create_bins(self, *args) -> bool:
-        commandFormat = "create_bins [-h | -size width height]"
-        commandDescription = "Creates array of bins with given dimentions"
+        commandFormat = "create_bins [-h | -size width height [-layered]]"
+        commandDescription = "Creates array of bins with given dimentions" \
+            ", with a horizontal and a vertical routing layer if layered"
 
         if ((len(args) == 1) & (args[0] == "-h")):
             print(f"{commandFormat}\n{commandDescription}")
             return True
-        elif ((len(args) == 3) & (args[0] == "-size")):
+        elif (
+            (len(args) in (3, 4)) and (args[0] == "-size")
+            and (args[3:] in ((), ("-layered",)))
+        ):
             if self._design.bins:
                 print("There are already bins created")
                 return False
@@ -265,7 +279,10 @@ class TclInterpreter:
                     "Dimentions for bins are meant to be integers")
                 return False
             
-            self._design.create_bins(width, height)
+            self._design.create_bins(
+                width, height,
+                layers=(Design.ROUTING_LAYERS if (len(args) == 4) else 0)
+            )
             return True
         else:
             raise TclError
@@ -379,123 +396,275 @@ class TclInterpreter:
     # End of method
 
     def _maze_routing(self, *args) -> bool:
-        commandFormat = "maze_routing [-h | -counterclockwise | -startRoutingFromCenter]"
-        commandDescription = "Routing"
+        commandFormat = "maze_routing [-h | [-counterclockwise] " \
+                        "[-startRoutingFromCenter] [-fullWave] [-steiner] " \
+                        "[-astar | -bidirectional | -pattern | -engine engine] " \
+                        "[-compact] [[-jobs jobs] [-tiles size [-halo bins]] | " \
+                        "-threads threads | -coarse factor] | " \
+                        "-negotiated [-capacity capacity] " \
+                        "[-iterations iterations] | -retry]"
+        commandDescription = "Routing\n" \
+            "-fullWave: propagates the wave on the whole grid, instead of " \
+            "stopping once the drain is reached\n" \
+            "-steiner: plans the connections of each net as a Steiner tree " \
+            "and searches each one first around its segment\n" \
+            "-astar: searches the connections with A* instead of Lee's wave\n" \
+            "-bidirectional: searches the connections with waves from both " \
+            "the net and the endpoint\n" \
+            "-pattern: tries L- and Z-shaped connections before Lee's wave\n" \
+            f"-engine: searches the connections with one of: " \
+            f"{', '.join(ROUTING_ENGINES)}\n" \
+            "-compact: stores the routed trees of the nets in arrays\n" \
+            "-jobs: routes the nets with non-overlapping bounding boxes in " \
+            "that many processes\n" \
+            "-tiles: routes the nets lying in a tile of size x size bins " \
+            "only in it and a halo of bins around it (default 2), before " \
+            "routing the rest on the whole grid\n" \
+            "-threads: routes the nets with non-overlapping bounding boxes " \
+            "in that many threads, best with -engine wave\n" \
+            "-coarse: routes each net on a grid coarser by the factor, then " \
+            "on the bins around its coarse route\n" \
+            "-negotiated: reroutes all nets on every iteration, negotiating " \
+            "the bins used over their capacity (default 1) until none is " \
+            "left or the iterations (default 10) end\n" \
+            "-retry: routes again the nets of the routed design left with " \
+            "endpoints not connected, as after removing blockages"
+
         if (len(args) == 1):
             if (args[0] == "-h"):
                 print(f"{commandFormat}\n{commandDescription}")
                 return True
-            elif (args[0] == "-counterclockwise"):
-                if not self._design:
-                    interfaceLogger.info("There is no design loaded")
-                    return
 
-                if not self._design.bins:
-                    interfaceLogger.info("There are no bins for routing to be done")
-                    return
+        routingOptions = self._parse_routing_options(args, True)
+        if routingOptions is None:
+            raise TclError
 
-                maze_routing(self._design, clockwiseRouting=False)
-                return True
-            elif (args[0] == "-startRoutingFromCenter"):
-                if not self._design:
-                    interfaceLogger.info("There is no design loaded")
-                    return
+        if not self._design:
+            interfaceLogger.info("There is no design loaded")
+            return
 
-                if not self._design.bins:
-                    interfaceLogger.info("There are no bins for routing to be done")
-                    return
+        if not self._design.bins:
+            interfaceLogger.info("There are no bins for routing to be done")
+            return
 
-                maze_routing(self._design, startRoutingFromCenter=True)
-                return True
-            else:
-                raise TclError
-        elif (len(args) == 0):
-            if not self._design:
-                interfaceLogger.info("There is no design loaded")
-                return
+        if routingOptions.pop("negotiated", False):
+            return negotiated_congestion_routing(
+                self._design, **routingOptions)
 
-            if not self._design.bins:
-                interfaceLogger.info("There are no bins for routing to be done")
-                return
+        if routingOptions.pop("retry", False):
+            if routingOptions.pop("compactTrees", False):
+                routingOptions["compactTree"] = True
+            retry_failed_nets(self._design, **routingOptions)
+            return True
 
-            maze_routing(self._design)
-        else:
-            raise TclError
+        maze_routing(self._design, **routingOptions)
+        return True
     # End of method
 
     def _maze_routing_net(self, *args) -> bool:
-        commandFormat = "maze_routing_net [-h | net [-counterclockwise | -startRoutingFromCenter]]"
-        commandDescription = "Routing specific net"
+        commandFormat = "maze_routing_net [-h | net [-counterclockwise] " \
+                        "[-startRoutingFromCenter] [-fullWave] [-steiner] " \
+                        "[-astar | -bidirectional | -pattern | -engine engine]]"
+        commandDescription = "Routing specific net\n" \
+            "-fullWave: propagates the wave on the whole grid, instead of " \
+            "stopping once the drain is reached\n" \
+            "-steiner: plans the connections of each net as a Steiner tree " \
+            "and searches each one first around its segment\n" \
+            "-astar: searches the connections with A* instead of Lee's wave\n" \
+            "-bidirectional: searches the connections with waves from both " \
+            "the net and the endpoint\n" \
+            "-pattern: tries L- and Z-shaped connections before Lee's wave\n" \
+            f"-engine: searches the connections with one of: " \
+            f"{', '.join(ROUTING_ENGINES)}"
 
-        if (len(args) == 1):
-            if (args[0] == "-h"):
-                print(f"{commandFormat}\n{commandDescription}")
-                return True
-            else:
-                if not self._design:
-                    interfaceLogger.info("There is no design loaded")
-                    return
+        if (len(args) == 0):
+            raise TclError
+        elif ((len(args) == 1) & (args[0] == "-h")):
+            print(f"{commandFormat}\n{commandDescription}")
+            return True
 
-                if not self._design.bins:
-                    interfaceLogger.info("There are no bins for routing to be done")
-                    return
+        routingOptions = self._parse_routing_options(args[1:])
+        if routingOptions is None:
+            raise TclError
 
-                net:(Net|None) = self._design.core.get_net(args[0])
-                if net is None:
-                    interfaceLogger.error(f"There is no net {args[0]}")
-                    return False
-                else:
-                    maze_routing_net(net, self._design)
-                    return True
-        elif (len(args) == 2):
-            routingFromCenter=False
-            clockwise=True
+        if not self._design:
+            interfaceLogger.info("There is no design loaded")
+            return
 
-            if not self._design:
-                interfaceLogger.info("There is no design loaded")
-                return
+        if not self._design.bins:
+            interfaceLogger.info("There are no bins for routing to be done")
+            return
 
-            if not self._design.bins:
-                interfaceLogger.info("There are no bins for routing to be done")
-                return
+        net:(Net|None) = self._design.core.get_net(args[0])
+        if net is None:
+            interfaceLogger.error(f"There is no net {args[0]}")
+            return False
 
-            if (args[1] == "-counterclockwise"):
-                net:Net = self._design.core.get_net(args[0])
-                if (not net):
-                    interfaceLogger.error(f"There is no net {args[0]}")
-                    return False
-                else:
-                    clockwise = False
-            elif (args[1] == "-startRoutingFromCenter"):
-                net:Net = self._design.core.get_net(args[0])
-                if (not net):
-                    interfaceLogger.error(f"There is no net {args[0]}")
-                    return False
-                else:
-                    routingFromCenter = True
-            else:
-                raise TclError
-            
-            maze_routing_net(net, self._design, routingFromCenter, clockwise)
-            return True
-        elif (len(args) == 2):
-            if (
-                (
-                    (args[1] == "-counterclockwise") 
-                    & (args[2] == "-startRoutingFromCenter")
-                )
-                | (
-                    (args[2] == "-counterclockwise") 
-                    & (args[1] == "-startRoutingFromCenter")
+        maze_routing_net(net, self._design, **routingOptions)
+        return True
+    # End of method
+
+    def _parse_routing_options(
+        self, args, designOptions:bool = False
+    ) -> (dict | None):
+        """
+        Parses the options of the routing commands into keyword arguments of
+        the routing functions. Options only valid when routing the whole
+        design are accepted if designOptions is set.
+        Returns None on invalid options.
+        """
+        routingOptions = {}
+
+        def _integer_value(option:str, minimum:int = 1) -> (int | None):
+            """
+            Returns the integer given after the option, if it is at least
+            the minimum, positive by default
+            """
+            if (i == len(args)):
+                interfaceLogger.error(f"Option {option} needs a value")
+                return None
+            try:
+                value = int(args[i])
+            except ValueError:
+                value = minimum - 1
+            if (value < minimum):
+                interfaceLogger.error(
+                    f"Option {option} is meant to be a "
+                    f"{'positive' if (minimum == 1) else 'non-negative'} "
+                    "integer"
                 )
-            ):
-                maze_routing_net(
-                    net, self._design, 
-                    startRoutingFromCenter=True, clockwiseRouting=False
+                return None
+            return value
+        # End of inner function
+
+        i = 0
+        while (i < len(args)):
+            match args[i]:
+                case "-counterclockwise":
+                    routingOptions["clockwiseRouting"] = False
+                case "-startRoutingFromCenter":
+                    routingOptions["startRoutingFromCenter"] = True
+                case "-fullWave":
+                    routingOptions["earlyTermination"] = False
+                case "-steiner":
+                    routingOptions["steinerTopology"] = True
+                case "-astar":
+                    routingOptions["engine"] = ASTAR_ENGINE
+                case "-bidirectional":
+                    routingOptions["engine"] = BIDIRECTIONAL_ENGINE
+                case "-pattern":
+                    routingOptions["engine"] = PATTERN_ENGINE
+                case "-engine":
+                    i += 1
+                    if ((i == len(args)) or (args[i] not in ROUTING_ENGINES)):
+                        interfaceLogger.error(
+                            "Routing engine is meant to be one of: "
+                            f"{', '.join(ROUTING_ENGINES)}"
+                        )
+                        return None
+                    routingOptions["engine"] = args[i]
+                case "-negotiated" if designOptions:
+                    routingOptions["negotiated"] = True
+                case "-retry" if designOptions:
+                    routingOptions["retry"] = True
+                case "-compact" if designOptions:
+                    routingOptions["compactTrees"] = True
+                case "-capacity" if designOptions:
+                    i += 1
+                    routingOptions["capacity"] = _integer_value("-capacity")
+                    if routingOptions["capacity"] is None:
+                        return None
+                case "-jobs" if designOptions:
+                    i += 1
+                    routingOptions["jobs"] = _integer_value("-jobs")
+                    if routingOptions["jobs"] is None:
+                        return None
+                case "-tiles" if designOptions:
+                    i += 1
+                    routingOptions["tileSize"] = _integer_value("-tiles")
+                    if routingOptions["tileSize"] is None:
+                        return None
+                case "-threads" if designOptions:
+                    i += 1
+                    routingOptions["threads"] = _integer_value("-threads")
+                    if routingOptions["threads"] is None:
+                        return None
+                case "-coarse" if designOptions:
+                    i += 1
+                    routingOptions["coarseFactor"] = _integer_value("-coarse")
+                    if routingOptions["coarseFactor"] is None:
+                        return None
+                case "-halo" if designOptions:
+                    i += 1
+                    routingOptions["halo"] = _integer_value("-halo", 0)
+                    if routingOptions["halo"] is None:
+                        return None
+                case "-iterations" if designOptions:
+                    i += 1
+                    routingOptions["maxIterations"] = \
+                        _integer_value("-iterations")
+                    if routingOptions["maxIterations"] is None:
+                        return None
+                case _:
+                    return None
+            i += 1
+        # End of while
+
+        # Options of the negotiated congestion routing
+        negotiatedOptions = ("capacity", "maxIterations")
+        searchOptions = (
+            "earlyTermination", "engine", "jobs", "tileSize", "halo",
+            "threads", "coarseFactor", "steinerTopology", "compactTrees"
+        )
+        if routingOptions.get("negotiated", False):
+            if any(option in routingOptions for option in searchOptions):
+                interfaceLogger.error(
+                    "Negotiated routing searches with its own engine")
+                return None
+        elif any(option in routingOptions for option in negotiatedOptions):
+            interfaceLogger.error(
+                "Options -capacity and -iterations need -negotiated")
+            return None
+
+        if (
+            ("threads" in routingOptions)
+            & (("jobs" in routingOptions) | ("tileSize" in routingOptions))
+        ):
+            interfaceLogger.error(
+                "Option -threads cannot be used with -jobs or -tiles")
+            return None
+
+        if (
+            ("coarseFactor" in routingOptions)
+            & any(
+                option in routingOptions
+                for option in ("jobs", "tileSize", "threads")
+            )
+        ):
+            interfaceLogger.error(
+                "Option -coarse cannot be used with -jobs, -tiles or -threads")
+            return None
+
+        if (
+            ("retry" in routingOptions)
+            & any(
+                option in routingOptions
+                for option in (
+                    "negotiated", "jobs", "tileSize", "threads", "coarseFactor"
                 )
-                return True
-        else:
-            raise TclError
+            )
+        ):
+            interfaceLogger.error(
+                "Option -retry routes the failed nets serially on the whole "
+                "grid"
+            )
+            return None
+
+        if (("halo" in routingOptions) & ("tileSize" not in routingOptions)):
+            interfaceLogger.error("Option -halo needs -tiles")
+            return None
+
+        return routingOptions
     # End of method
 
     def _net_info(self, *args) -> bool:
@@ -515,8 +684,9 @@ class TclInterpreter:
                     return False
                 else:
                     interfaceLogger.info(net)
-                    if (net.connectionsTree is not None):
-                        print_generic_tree(net.connectionsTree)
+                    connectionsTree = net.connectionsTree
+                    if (connectionsTree is not None):
+                        print_generic_tree(connectionsTree)
                     return True
         else:
             raise TclError
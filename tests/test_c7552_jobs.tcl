@@ -0,0 +1,17 @@
+read_design -f benchmarks\\c7552.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 48 48
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing
+set leeWL [calculate_WL -tree]
+# Processes on bins in shared memory
+remove_bins
+create_bins -size 48 48
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -jobs 4
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -jobs 4 routes the trees of serial Lee"} else {puts "FAIL: maze_routing -jobs 4 routes other trees than serial Lee: $routedWL != $leeWL"}
+#start_gui
+exit
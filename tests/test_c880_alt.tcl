@@ -0,0 +1,11 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -engine alt
+calculate_WL -HPWL
+calculate_WL -tree
+design_info
+#start_gui
+exit
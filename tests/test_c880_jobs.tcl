@@ -0,0 +1,17 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing
+set leeWL [calculate_WL -tree]
+# Nets with non-overlapping bounding boxes in processes
+remove_bins
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -jobs 2
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -jobs 2 routes the trees of serial Lee"} else {puts "FAIL: maze_routing -jobs 2 routes other trees than serial Lee: $routedWL != $leeWL"}
+#start_gui
+exit
@@ -0,0 +1,12 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26 -layered
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -engine layered
+bins_info
+calculate_WL -HPWL
+calculate_WL -tree
+design_info
+#start_gui
+exit
@@ -0,0 +1,20 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+add_blockage -bin 12 20
+add_blockage -bin 20 5
+maze_routing
+calculate_WL -tree
+# Route again the nets left with endpoints in the blockages
+remove_blockage -bin 7 13
+remove_blockage -bin 17 13
+remove_blockage -bin 12 20
+remove_blockage -bin 20 5
+maze_routing -retry
+calculate_WL -HPWL
+calculate_WL -tree
+design_info
+#start_gui
+exit
@@ -0,0 +1,25 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing
+set leeWL [calculate_WL -tree]
+# Nets with non-overlapping bounding boxes in threads
+remove_bins
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -threads 2
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -threads 2 routes the trees of serial Lee"} else {puts "FAIL: maze_routing -threads 2 routes other trees than serial Lee: $routedWL != $leeWL"}
+# Vectorised wave in threads
+remove_bins
+create_bins -size 26 26
+add_blockage -bin 7 13
+add_blockage -bin 17 13
+maze_routing -threads 2 -engine wave
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -threads 2 -engine wave routes the trees of serial Lee"} else {puts "FAIL: maze_routing -threads 2 -engine wave routes other trees than serial Lee: $routedWL != $leeWL"}
+#start_gui
+exit
@@ -0,0 +1,19 @@
+read_design -f benchmarks\\c880.practicalformat.txt
+while {![place_random]} {}
+create_bins -size 26 26
+maze_routing
+set leeWL [calculate_WL -tree]
+# Nets in tiles with a halo, without blockages the same trees
+remove_bins
+create_bins -size 26 26
+maze_routing -tiles 8 -jobs 2
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -tiles 8 -jobs 2 routes the trees of serial Lee"} else {puts "FAIL: maze_routing -tiles 8 -jobs 2 routes other trees than serial Lee: $routedWL != $leeWL"}
+# Nets kept in their tile
+remove_bins
+create_bins -size 26 26
+maze_routing -tiles 8 -halo 0 -jobs 2
+set routedWL [calculate_WL -tree]
+if {$routedWL == $leeWL} {puts "PASS: maze_routing -tiles 8 -halo 0 -jobs 2 routes the trees of serial Lee"} else {puts "FAIL: maze_routing -tiles 8 -halo 0 -jobs 2 routes other trees than serial Lee: $routedWL != $leeWL"}
+#start_gui
+exit